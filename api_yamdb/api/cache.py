@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+GENERATION_KEY = 'generation:{}'
+MODIFIED_KEY = 'generation-modified:{}'
+# Пространства имен, ответы которых содержат данные другого пространства
+# и сдвигаются вместе с ним.
+DEPENDENT_NAMESPACES = {'titles': ('title-previews',)}
+
+
+def get_generation(namespace: str) -> int:
+    """
+    Возвращает текущее поколение кеша для пространства имен.
+
+    Начальное поколение берется из текущего времени, чтобы после очистки
+    кеша не повторялись поколения, уже выданные клиентам в ETag.
+    """
+    return cache.get_or_set(
+        GENERATION_KEY.format(namespace), time.time_ns, None
+    )
+
+
+def get_version(namespace: str) -> tuple:
+    """
+    Возвращает поколение пространства имен и время его последнего
+    изменения в секундах.
+    """
+    generation = get_generation(namespace)
+    modified = cache.get_or_set(
+        MODIFIED_KEY.format(namespace), time.time, None
+    )
+    return generation, modified
+
+
+def bump_generation(*namespaces: str) -> None:
+    """
+    Сдвигает поколение кеша вместе с зависимыми пространствами имен:
+    ключи со старым поколением больше не читаются и вытесняются по
+    таймауту.
+    """
+    namespaces = {
+        dependent
+        for namespace in namespaces
+        for dependent in (
+            namespace, *DEPENDENT_NAMESPACES.get(namespace, ())
+        )
+    }
+    for namespace in namespaces:
+        key = GENERATION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+        cache.set(MODIFIED_KEY.format(namespace), time.time(), None)
+
+
+STATS_KEY = 'response-cache:stats:{}'
+CACHE_RESULTS = ('hit', 'stale', 'miss')
+
+
+def count_cache_result(result: str) -> None:
+    """Увеличивает счетчик попаданий, устаревших ответов или промахов."""
+    key = STATS_KEY.format(result)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_cache_stats() -> dict:
+    """Возвращает счетчики кеша ответов."""
+    stats = {
+        result: cache.get(STATS_KEY.format(result), 0)
+        for result in CACHE_RESULTS
+    }
+    total = sum(stats.values())
+    stats['hit_ratio'] = (
+        round((stats['hit'] + stats['stale']) / total, 4) if total else None
+    )
+    return stats
+
+
+class ModelSnapshot:
+    """
+    Снимок всех записей небольшой модели в памяти процесса.
+
+    Записи хранятся уже сериализованными и отсортированными. Актуальность
+    снимка проверяется по поколению пространства имен `namespace` в общем
+    кеше, поэтому каждый процесс пересобирает свой снимок после любого
+    изменения модели. Новый снимок собирается целиком и подменяет старый
+    одним присваиванием, так что читатели всегда видят согласованные данные.
+    """
+
+    def __init__(self, queryset, serializer_class, namespace):
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+        self.namespace = namespace
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get_rows(self) -> tuple:
+        """Возвращает записи снимка, при необходимости пересобирая его."""
+        generation = get_generation(self.namespace)
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != generation:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot[0] != generation:
+                    # Поколение читается до запроса к базе: изменение во
+                    # время сборки сдвинет его, и следующий запрос соберет
+                    # снимок заново.
+                    snapshot = (generation, self.build_rows())
+                    self._snapshot = snapshot
+        return snapshot[1]
+
+    def build_rows(self) -> tuple:
+        queryset = self.queryset.all()
+        return tuple(self.serializer_class(queryset, many=True).data)
@@ -3,3 +3,14 @@ FORBIDDEN_USERNAMES = [
 ]
 MIN_SCORE: int = 1
 MAX_SCORE: int = 10
+MAX_REVIEWS_PREVIEW: int = 20
+COUNT_CACHE_TIMEOUT: int = 60 * 60
+ESTIMATED_COUNT_LIMIT: int = 1000
+RESPONSE_CACHE_TIMEOUT: int = 60 * 60 * 24
+RESPONSE_CACHE_LOCK_TIMEOUT: int = 10
+TOP_TITLES_LIMIT: int = 10
+MAX_TOP_TITLES: int = 50
+USER_SEARCH_PREFIX: str = 'prefix'
+USER_SEARCH_CONTAINS: str = 'contains'
+MAX_BULK_REVIEWS: int = 5000
+EXPORT_CHUNK_SIZE: int = 500
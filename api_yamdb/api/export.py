@@ -0,0 +1,73 @@
+from collections import defaultdict
+from itertools import islice
+
+from rest_framework import serializers
+
+from api import const
+from reviews.models import Comment, Review
+
+REVIEW_EXPORT_FIELDS = (
+    'id', 'author', 'text', 'score', 'pub_date', 'comments_count'
+)
+# В CSV комментарии идут отдельными строками сразу после своего отзыва.
+REVIEW_COMMENT_EXPORT_FIELDS = ('type', 'review_id', *REVIEW_EXPORT_FIELDS)
+
+
+def iter_title_reviews(title_id, with_comments=False,
+                       chunk_size=const.EXPORT_CHUNK_SIZE):
+    """
+    Выдает отзывы произведения в порядке API, при `with_comments` - с
+    комментариями в поле `comments`. Отзывы читаются итератором порциями
+    по `chunk_size`, комментарии - одним запросом на порцию, поэтому
+    расход памяти не зависит от числа отзывов.
+    """
+    date_field = serializers.DateTimeField()
+    reviews = (
+        Review.objects.filter(title_id=title_id)
+        .order_by('-pub_date', '-id')
+        .values_list(
+            'id', 'author__username', 'text', 'score', 'pub_date',
+            'comments_count',
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    for chunk in iter(lambda: list(islice(reviews, chunk_size)), []):
+        comments = defaultdict(list)
+        if with_comments:
+            for review_id, *comment in (
+                Comment.objects.filter(
+                    review_id__in=[review[0] for review in chunk]
+                )
+                .order_by('-pub_date', '-id')
+                .values_list(
+                    'review_id', 'id', 'author__username', 'text', 'pub_date'
+                )
+            ):
+                comment_id, author, text, pub_date = comment
+                comments[review_id].append({
+                    'id': comment_id,
+                    'author': author,
+                    'text': text,
+                    'pub_date': date_field.to_representation(pub_date),
+                })
+        for review_id, author, text, score, pub_date, count in chunk:
+            review = {
+                'id': review_id,
+                'author': author,
+                'text': text,
+                'score': score,
+                'pub_date': date_field.to_representation(pub_date),
+                'comments_count': count,
+            }
+            if with_comments:
+                review['comments'] = comments[review_id]
+            yield review
+
+
+def flatten_reviews(reviews):
+    """Разворачивает отзывы с комментариями в плоские строки для CSV."""
+    for review in reviews:
+        comments = review.pop('comments')
+        yield {'type': 'review', **review}
+        for comment in comments:
+            yield {'type': 'comment', 'review_id': review['id'], **comment}
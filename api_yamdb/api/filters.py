@@ -1,17 +1,107 @@
 import django_filters
+from django.db.models import Exists, OuterRef, Subquery
+from rest_framework.filters import OrderingFilter
 
-from reviews.models import Title
+from reviews.models import Category, Title
+from reviews.search import search_titles
+
+
+class SlugInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Фильтр по списку слагов через запятую."""
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка произведений по разрешенным полям. В конец добавляется id в
+    том же направлении, чтобы порядок был однозначным и совпадал с
+    составными индексами.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [*ordering, '-id' if ordering[-1].startswith('-') else 'id']
 
 
 class TitleFilterSet(django_filters.FilterSet):
+    """
+    Фильтры произведений. Жанры и категории принимают несколько слагов
+    через запятую и проверяются подзапросами EXISTS/IN, поэтому строки
+    произведений не размножаются соединением и DISTINCT не нужен.
+    """
+
+    MATCH_ANY = 'any'
+    MATCH_ALL = 'all'
 
-    category = django_filters.CharFilter(
-        field_name='category__slug',
+    category = SlugInFilter(method='filter_category')
+    genre = SlugInFilter(method='filter_genre')
+    genre_match = django_filters.ChoiceFilter(
+        choices=((MATCH_ANY, 'Любой из жанров'), (MATCH_ALL, 'Все жанры')),
+        method='filter_genre_match',
+    )
+    search = django_filters.CharFilter(method='filter_search')
+    year_min = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte'
     )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
+    year_max = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte'
     )
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'category', 'genre')
+
+    def filter_category(self, queryset, name, value):
+        categories = Category.objects.filter(slug__in=value).values('pk')
+        if len(set(value)) == 1:
+            # Сравнение на равенство, в отличие от IN, позволяет брать
+            # порядок сортировки из составного индекса по категории.
+            return queryset.filter(category=Subquery(categories[:1]))
+        return queryset.filter(category__in=categories)
+
+    def filter_genre(self, queryset, name, value):
+        links = Title.genre.through.objects.filter(title=OuterRef('pk'))
+        if self.form.cleaned_data.get('genre_match') != self.MATCH_ALL:
+            return queryset.filter(
+                Exists(links.filter(genre__slug__in=value))
+            )
+        for slug in set(value):
+            queryset = queryset.filter(Exists(links.filter(genre__slug=slug)))
+        return queryset
+
+    def filter_genre_match(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+def filter_by_title_taxonomy(queryset, title_field, category=None,
+                             genre=None):
+    """
+    Оставляет записи, произведение которых по пути `title_field` относится
+    к категории `category` и жанру `genre`.
+
+    Оба условия - коррелированные подзапросы EXISTS: в отличие от
+    соединения они не становятся внешним циклом запроса, и записи
+    читаются по индексу сортировки до заполнения страницы.
+    """
+    if category:
+        queryset = queryset.filter(
+            Exists(
+                Title.objects.filter(
+                    pk=OuterRef(title_field), category__slug=category
+                )
+            )
+        )
+    if genre:
+        queryset = queryset.filter(
+            Exists(
+                Title.genre.through.objects.filter(
+                    title=OuterRef(title_field), genre__slug=genre
+                )
+            )
+        )
+    return queryset
@@ -0,0 +1,65 @@
+from timeit import repeat
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import TitleGetSerializer, TitleValuesSerializer
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+
+    help = 'Compare title serializers on pages of several sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[10, 50, 100],
+            help='Page sizes to benchmark.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Runs per page size, the best run is reported.',
+        )
+
+    def serialize_models(self, size):
+        titles = (
+            Title.objects.select_related('category')
+            .prefetch_related('genre')
+            .order_by('name')[:size]
+        )
+        return TitleGetSerializer(titles, many=True).data
+
+    def serialize_values(self, size):
+        titles = TitleValuesSerializer.get_values(
+            Title.objects.order_by('name'), TitleGetSerializer.Meta.fields
+        )[:size]
+        return TitleValuesSerializer(list(titles), many=True).data
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        for size in options['sizes']:
+            if renderer.render(self.serialize_models(size)) != (
+                renderer.render(self.serialize_values(size))
+            ):
+                raise CommandError(f'Outputs differ for page size {size}.')
+            timings = [
+                min(
+                    repeat(
+                        lambda: serialize(size),
+                        number=1,
+                        repeat=options['repeat'],
+                    )
+                )
+                * 1000
+                for serialize in (self.serialize_models, self.serialize_values)
+            ]
+            self.stdout.write(
+                f'{size:>5} titles: serializer {timings[0]:.2f} ms, '
+                f'values {timings[1]:.2f} ms, '
+                f'x{timings[0] / timings[1]:.1f}'
+            )
@@ -3,7 +3,9 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
+from api.cache import bump_generation
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.utils import rebuild_comment_counts, rebuild_title_ratings
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 
@@ -29,7 +31,15 @@ files_func = {
             for title in data
         ],
     ),
-    'users.csv': lambda data: (User, [User(**user) for user in data]),
+    # bulk_create не вызывает save(), поэтому нормализованное имя для
+    # поиска заполняется здесь.
+    'users.csv': lambda data: (
+        User,
+        [
+            User(**user, username_normalized=user['username'].casefold())
+            for user in data
+        ],
+    ),
     'review.csv': lambda data: (
         Review,
         [
@@ -77,6 +87,12 @@ def load_data():
                 model, instances = get_data(reader)
                 # Сохраняем объекты в базу данных
                 model.objects.bulk_create(instances, ignore_conflicts=True)
+    # bulk_create не отправляет сигналы, поэтому рейтинги и счетчики
+    # комментариев пересчитываются, а кеши сбрасываются после загрузки всех
+    # данных.
+    rebuild_title_ratings()
+    rebuild_comment_counts()
+    bump_generation('title-counts', 'titles', 'genres', 'categories')
 
 
 class Command(BaseCommand):
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import bump_generation
+from reviews.utils import find_rating_drift, rebuild_title_ratings
+
+
+class Command(BaseCommand):
+
+    help = 'Rebuild or audit stored title ratings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report titles with drifted ratings.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(find_rating_drift())
+        for title in drifted:
+            self.stdout.write(
+                f'Title {title.pk}: stored {title.score_sum}/'
+                f'{title.reviews_count}, actual {title.actual_score_sum}/'
+                f'{title.actual_reviews_count}'
+            )
+        if options['check']:
+            if drifted:
+                raise CommandError(f'{len(drifted)} title(s) have drifted.')
+            self.stdout.write('All title ratings are consistent.')
+            return
+        rebuild_title_ratings()
+        # update() не отправляет сигналы, поэтому кеши сбрасываются вручную.
+        bump_generation(
+            'titles', 'title-counts',
+            *(f'reviews:{title.pk}' for title in drifted)
+        )
+        self.stdout.write(
+            f'Ratings rebuilt, {len(drifted)} title(s) were drifted.'
+        )
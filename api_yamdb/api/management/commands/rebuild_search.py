@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.search import (
+    SEARCH_INDEXES,
+    is_search_supported,
+    rebuild_search_index,
+)
+
+
+class Command(BaseCommand):
+
+    help = 'Rebuild full-text search indexes'
+
+    def handle(self, *args, **options):
+        if not is_search_supported():
+            raise CommandError('Full-text indexes require SQLite FTS5.')
+        for index in SEARCH_INDEXES:
+            rebuild_search_index(index)
+            self.stdout.write(f'Index {index.table} rebuilt.')
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import bump_generation
+from reviews.models import Review, Title
+from reviews.utils import (
+    find_comment_count_drift,
+    find_rating_drift,
+    rebuild_comment_counts,
+    rebuild_title_ratings,
+)
+
+
+class Command(BaseCommand):
+
+    help = 'Reconcile stored review and comment counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report titles and reviews with drifted counters.',
+        )
+
+    def handle(self, *args, **options):
+        titles = [title.pk for title in find_rating_drift()]
+        reviews = list(find_comment_count_drift())
+        for title_id in titles:
+            self.stdout.write(f'Title {title_id}: drifted review counters')
+        for review in reviews:
+            self.stdout.write(
+                f'Review {review.pk}: stored {review.comments_count}, '
+                f'actual {review.actual_comments_count} comments'
+            )
+        if options['check']:
+            if titles or reviews:
+                raise CommandError(
+                    f'{len(titles)} title(s) and {len(reviews)} review(s) '
+                    'have drifted.'
+                )
+            self.stdout.write('All counters are consistent.')
+            return
+        if titles:
+            rebuild_title_ratings(Title.objects.filter(pk__in=titles))
+        if reviews:
+            rebuild_comment_counts(
+                Review.objects.filter(pk__in=[review.pk for review in reviews])
+            )
+        if titles or reviews:
+            # update() не отправляет сигналы, поэтому кеши сбрасываются
+            # вручную.
+            title_ids = {*titles, *(review.title_id for review in reviews)}
+            bump_generation(
+                'titles', 'title-counts',
+                *(f'reviews:{title_id}' for title_id in title_ids)
+            )
+        self.stdout.write(
+            f'Counters reconciled, {len(titles)} title(s) and '
+            f'{len(reviews)} review(s) were drifted.'
+        )
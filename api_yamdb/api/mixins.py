@@ -0,0 +1,156 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.filters import SearchFilter
+from rest_framework.response import Response
+
+from api import const
+from api.cache import bump_generation, count_cache_result, get_version
+from reviews.utils import batch_deletes
+
+
+class ConditionalGetMixin:
+    """
+    Поддерживает условные GET-запросы списка. ETag и Last-Modified берутся
+    из поколения пространства имен `cache_namespace` без обращения к базе,
+    и при совпадении If-None-Match или If-Modified-Since сразу возвращается
+    304. Вьюсеты с `retrieve` оборачивают его в
+    `get_conditional_response` сами.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def get_cache_namespace(self):
+        return self.cache_namespace
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        namespace = self.get_cache_namespace()
+        generation, modified = get_version(namespace)
+        etag = quote_etag(f'{namespace}-{generation}')
+        last_modified = int(modified)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_response(
+                handler, generation, request, *args, **kwargs
+            )
+            # Устаревший ответ не помечается текущей версией, иначе клиент
+            # сохранил бы его как актуальный.
+            if (
+                response.status_code != status.HTTP_200_OK
+                or response.get('X-Cache') == 'STALE'
+            ):
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_response(self, handler, generation, request, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """
+    Кеширует ответы на GET-запросы списка и поддерживает условные запросы.
+
+    Ключ кеша строится по пути и строке запроса, запись хранит поколение
+    пространства имен `cache_namespace`. Устаревшую запись пересобирает
+    только один запрос, остальные в это время получают устаревший ответ.
+    """
+
+    def get_response_cache_key(self, request):
+        query = sorted(request.query_params.lists())
+        digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+        return f'response-cache:{self.get_cache_namespace()}:{digest}'
+
+    def get_response(self, handler, generation, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        lock_key = f'{key}:lock'
+        entry = cache.get(key)
+        if entry is not None:
+            entry_generation, data = entry
+            if entry_generation == generation:
+                return self.cached_response(data, 'hit')
+            if not cache.add(lock_key, 1, const.RESPONSE_CACHE_LOCK_TIMEOUT):
+                return self.cached_response(data, 'stale')
+
+        try:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(
+                    key, (generation, response.data),
+                    const.RESPONSE_CACHE_TIMEOUT,
+                )
+        finally:
+            if entry is not None:
+                cache.delete(lock_key)
+        count_cache_result('miss')
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cached_response(self, data, result):
+        count_cache_result(result)
+        return Response(data, headers={'X-Cache': result.upper()})
+
+
+class BatchedDestroyMixin:
+    """
+    Удаляет объект в блоке `batch_deletes`: счетчики отзывов и
+    комментариев, затронутые каскадом, пересчитываются одним пакетом, и
+    сдвигаются версии списков отзывов измененных произведений.
+    """
+
+    def perform_destroy(self, instance):
+        with batch_deletes() as batch:
+            super().perform_destroy(instance)
+        if batch.changed_title_ids:
+            bump_generation(
+                'titles',
+                *(f'reviews:{pk}' for pk in batch.changed_title_ids),
+            )
+
+
+class SnapshotListMixin:
+    """
+    Отдает список из снимка `snapshot` в памяти процесса без обращения к
+    базе. Параметр `search` обрабатывается так же, как в `SearchFilter`:
+    каждое слово запроса должно входить в одно из полей `search_fields`
+    без учета регистра.
+    """
+
+    snapshot = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.search_rows(self.snapshot.get_rows(), request)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(rows)
+
+    def search_rows(self, rows, request):
+        terms = [
+            term.casefold()
+            for term in SearchFilter().get_search_terms(request)
+        ]
+        if not terms:
+            return list(rows)
+        return [
+            row for row in rows
+            if all(
+                any(
+                    term in str(row[field]).casefold()
+                    for field in self.search_fields
+                )
+                for term in terms
+            )
+        ]
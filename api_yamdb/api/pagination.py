@@ -0,0 +1,406 @@
+import binascii
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import partial
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import (
+    EmptyPage, Page, PageNotAnInteger, Paginator
+)
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from api import const
+from api.cache import get_generation
+
+
+class ProbedPage(Page):
+    """Страница, наличие следующей страницы у которой задано выборкой."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который хранит количество объектов в кеше под ключом
+    `cache_key`. Если задан `count_limit`, объекты считаются только до этого
+    предела, и количество становится оценкой снизу.
+
+    При оценке количество не ограничивает номера страниц: страница
+    выбирается с одной лишней записью, которая показывает, есть ли
+    следующая страница, а несуществующей считается только пустая
+    страница после первой.
+    """
+
+    def __init__(self, *args, cache_key=None, count_limit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+        self.count_limit = count_limit
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.cache_key) if self.cache_key else None
+        if count is None:
+            count = self.get_count()
+            if self.cache_key:
+                cache.set(self.cache_key, count, const.COUNT_CACHE_TIMEOUT)
+        return count
+
+    def get_count(self):
+        if self.count_limit is None:
+            return self.object_list.count()
+        return min(
+            self.object_list[: self.count_limit + 1].count(), self.count_limit
+        )
+
+    @property
+    def is_estimated(self):
+        return self.count_limit is not None and self.count >= self.count_limit
+
+    def validate_number(self, number):
+        if not self.is_estimated:
+            return super().validate_number(number)
+        # Проверяется только нижняя граница, верхнюю проверяет выборка.
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        if not self.is_estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom: bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        # Просмотренные записи уточняют оценку снизу, но в кеш не попадают.
+        self.count = max(self.count, bottom + len(rows))
+        return ProbedPage(
+            rows[: self.per_page], number, self,
+            has_next=len(rows) > self.per_page,
+        )
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с режимом курсора по ключу сортировки.
+
+    Режим курсора включается параметром `pagination=cursor`. Курсор хранит
+    значения полей `keyset_ordering` крайней записи страницы, поэтому
+    следующая страница выбирается поиском по индексу, а не через OFFSET,
+    и COUNT(*) не выполняется. Курсор нельзя совмещать с другой
+    сортировкой запроса (`ordering`, релевантность поиска): на такой
+    запрос возвращается ошибка 400.
+    """
+
+    keyset_ordering = ()
+    pagination_query_param = 'pagination'
+    pagination_mode = 'cursor'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    ordering_conflict_message = (
+        'Режим курсора поддерживает только сортировку по умолчанию.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = (
+            request.query_params.get(self.pagination_query_param)
+            == self.pagination_mode
+        )
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        ordering = queryset.query.order_by
+        if ordering and tuple(ordering) != tuple(self.keyset_ordering):
+            raise ValidationError(
+                {self.pagination_query_param: self.ordering_conflict_message}
+            )
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.keyset_ordering
+        ]
+        cursor, reverse = self.decode_cursor(request)
+
+        ordering = self.keyset_ordering
+        if reverse:
+            ordering = [self.reverse_order(name) for name in ordering]
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.get_seek_filter(ordering, self.to_python(cursor))
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        first = last = cursor
+        if results:
+            first = self.get_position(results[0])
+            last = self.get_position(results[-1])
+        if reverse:
+            has_next, has_previous = cursor is not None, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+        self.next_position = last if has_next else None
+        self.previous_position = first if has_previous else None
+        return results
+
+    @staticmethod
+    def reverse_order(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def get_seek_filter(self, ordering, position):
+        """
+        Строит условие `(a, b) > (x, y)` в виде
+        `a >= x AND (a > x OR (a = x AND b > y))`: первое слагаемое
+        ограничивает диапазон индекса, остальное отсекает совпадения.
+        """
+        seek = Q()
+        equal = {}
+        for name, value in zip(ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            seek |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & seek
+
+    def get_position(self, instance):
+        if isinstance(instance, dict):
+            # Строка values() вместо объекта модели.
+            instance = SimpleNamespace(**instance)
+        return [field.value_to_string(instance) for field in self.fields]
+
+    def to_python(self, position):
+        try:
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, position)
+            ]
+        except DjangoValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position = [str(value) for value in cursor['p']]
+            reverse = bool(cursor.get('r'))
+        except (binascii.Error, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ('next', self.get_next_link()),
+                    ('previous', self.get_previous_link()),
+                    ('results', data),
+                ]
+            )
+        )
+
+
+class TitlePagination(KeysetPagination):
+    """
+    Пагинация произведений, курсор по названию и id.
+
+    В постраничном режиме количество произведений кешируется по сигнатуре
+    фильтров запроса. Параметр `count=estimated` ограничивает подсчет
+    пределом `ESTIMATED_COUNT_LIMIT`.
+    """
+
+    keyset_ordering = ('name', 'id')
+    count_query_param = 'count'
+    count_cache_namespace = 'title-counts'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated_count = (
+            request.query_params.get(self.count_query_param) == 'estimated'
+        )
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            cache_key=self.get_count_cache_key(request, queryset, view),
+            count_limit=(
+                const.ESTIMATED_COUNT_LIMIT if self.estimated_count else None
+            ),
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_filter_signature(self, request, queryset, view):
+        """
+        Возвращает нормализованные значения фильтров, влияющих на
+        количество произведений.
+        """
+        filterset_class = getattr(view, 'filterset_class', None)
+        if filterset_class is None:
+            return []
+        filterset = filterset_class(
+            request.query_params, queryset=queryset, request=request
+        )
+        if not filterset.is_valid():
+            return None
+        return sorted(
+            (name, repr(value))
+            for name, value in filterset.form.cleaned_data.items()
+            if value not in (None, '', [])
+        )
+
+    def get_count_cache_key(self, request, queryset, view):
+        signature = self.get_filter_signature(request, queryset, view)
+        if signature is None:
+            return None
+        digest = hashlib.md5(
+            repr((self.estimated_count, signature)).encode()
+        ).hexdigest()
+        generation = get_generation(self.count_cache_namespace)
+        return f'{self.count_cache_namespace}:{generation}:{digest}'
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if not self.keyset_mode and self.estimated_count:
+            response.data['count_estimated'] = (
+                self.page.paginator.is_estimated
+            )
+        return response
+
+
+class ReviewCommentPagination(KeysetPagination):
+    """Пагинация отзывов и комментариев, курсор по дате публикации и id."""
+
+    keyset_ordering = ('-pub_date', '-id')
+
+
+class ActivityPagination(KeysetPagination):
+    """
+    Курсорная пагинация ленты, которая сливает несколько потоков записей
+    по убыванию даты.
+
+    Потоки передаются словарем вид записи - queryset, порядок видов
+    определяет порядок записей с одинаковой датой. Из каждого потока
+    поиском по индексу после курсора берется не больше страницы записей,
+    и потоки сливаются в памяти. Курсор хранит дату, id и вид последней
+    записи страницы.
+    """
+
+    keyset_ordering = ('-pub_date', '-id')
+
+    def paginate_streams(self, streams, request):
+        self.keyset_mode = True
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.kinds = list(streams)
+        model = next(iter(streams.values())).model
+        self.fields = [
+            model._meta.get_field(name.lstrip('-'))
+            for name in self.keyset_ordering
+        ]
+        cursor, cursor_kind = self.decode_cursor(request)
+        date_field = self.fields[0].name
+
+        rows = []
+        for kind, queryset in streams.items():
+            queryset = queryset.order_by(*self.keyset_ordering)
+            if cursor is not None:
+                position = self.to_python(cursor)
+                order = self.kinds.index(kind) - self.kinds.index(cursor_kind)
+                if order == 0:
+                    queryset = queryset.filter(
+                        self.get_seek_filter(self.keyset_ordering, position)
+                    )
+                else:
+                    # Записи видов, которые идут после вида курсора, с той
+                    # же датой еще не выводились.
+                    lookup = 'lte' if order > 0 else 'lt'
+                    queryset = queryset.filter(
+                        **{f'{date_field}__{lookup}': position[0]}
+                    )
+            rows.extend(
+                (kind, instance) for instance in queryset[: self.page_size + 1]
+            )
+        rows.sort(
+            key=lambda row: (
+                getattr(row[1], date_field),
+                -self.kinds.index(row[0]),
+                row[1].pk,
+            ),
+            reverse=True,
+        )
+
+        has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.previous_position = None
+        self.next_position = None
+        if has_next:
+            kind, instance = rows[-1]
+            self.next_position = [*self.get_position(instance), kind]
+        return rows
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            *position, kind = [str(value) for value in cursor['p']]
+        except (binascii.Error, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.fields) or kind not in self.kinds:
+            raise NotFound(self.invalid_cursor_message)
+        return position, kind
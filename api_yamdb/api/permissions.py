@@ -24,6 +24,18 @@ class IsAdminOrReadOnly(IsAdminOrSuperuser):
         )
 
 
+class IsAdminOrModerator(BasePermission):
+    """
+    Предоставляет доступ только администраторам и модераторам.
+    """
+
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and request.user.is_admin_or_moderator
+        )
+
+
 class IsAdminOrOwnerOrReadOnly(BasePermission):
     """
     Для аутентифицированных пользователей имеющих статус администратора или
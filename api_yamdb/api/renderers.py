@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class RowsRenderer(BaseRenderer):
+    """
+    Базовый класс построчных форматов выгрузки. `render_rows` выдает
+    записи по одной строке, чтобы их можно было отдавать потоком.
+    """
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(self.render_rows(rows)).encode(self.charset)
+
+    def render_rows(self, rows, fields=None):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(RowsRenderer):
+    """Выводит каждую запись отдельной строкой JSON."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render_rows(self, rows, fields=None):
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+class CSVRenderer(RowsRenderer):
+    """
+    Выводит записи в CSV. Заголовок берется из `fields` или из ключей
+    первой записи.
+    """
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_rows(self, rows, fields=None):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush():
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+
+        # Заголовок отдается сразу, до чтения первой записи.
+        if fields is not None:
+            writer.writerow(fields)
+            yield flush()
+        for row in rows:
+            if fields is None:
+                fields = tuple(row)
+                writer.writerow(fields)
+            writer.writerow([row.get(name, '') for name in fields])
+            yield flush()
@@ -1,10 +1,29 @@
 from django.contrib.auth.tokens import default_token_generator
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import IntegrityError
+from django.utils.encoding import smart_str
+from django.utils.html import escape
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
 
 from api import const
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    User,
+    score_count_field,
+)
+from reviews.search import SNIPPET_MARKERS
+from reviews.utils import (
+    IMPORT_AUTHOR_NOT_FOUND,
+    IMPORT_DUPLICATE_REVIEW,
+    IMPORT_TITLE_NOT_FOUND,
+)
 
 
 class UserBaseSerializer(serializers.ModelSerializer):
@@ -93,7 +112,215 @@ class TitleGetSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id',
+            'rating',
+            'reviews_count',
+            'genre',
+            'category',
+            'name',
+            'description',
+            'year',
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        title_fields = self.context.get('title_fields')
+        if title_fields is not None:
+            for name in set(TitleGetSerializer.Meta.fields) - set(
+                title_fields
+            ):
+                self.fields.pop(name)
+
+
+class TitleValuesSerializer:
+    """
+    Быстрый сериализатор на чтение для модели Title.
+
+    Строит ответ из строк `values()` и одного запроса жанров страницы без
+    полей DRF. Результат совпадает с ответом TitleGetSerializer.
+    """
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.title_fields = (context or {}).get(
+            'title_fields', TitleGetSerializer.Meta.fields
+        )
+
+    @staticmethod
+    def get_values(queryset, title_fields):
+        """Возвращает строки произведений с колонками выбранных полей."""
+        columns = ['id', 'name']
+        columns.extend(
+            name
+            for name in ('rating', 'reviews_count', 'description', 'year')
+            if name in title_fields
+        )
+        if 'category' in title_fields:
+            columns.extend(('category', 'category__name', 'category__slug'))
+        return queryset.values(*columns)
+
+    def get_genres(self, rows):
+        """Возвращает жанры произведений, сгруппированные по id."""
+        genres = {row['id']: [] for row in rows}
+        links = (
+            Title.genre.through.objects.filter(title_id__in=genres)
+            .order_by('genre__name')
+            .values_list('title_id', 'genre__name', 'genre__slug')
+        )
+        for title_id, name, slug in links:
+            genres[title_id].append({'name': name, 'slug': slug})
+        return genres
+
+    def to_representation(self, row, genres):
+        data = {}
+        for name in self.title_fields:
+            if name == 'genre':
+                data[name] = genres[row['id']]
+            elif name == 'category':
+                data[name] = (
+                    None
+                    if row['category'] is None
+                    else {
+                        'name': row['category__name'],
+                        'slug': row['category__slug'],
+                    }
+                )
+            else:
+                data[name] = row[name]
+        return data
+
+    @property
+    def data(self):
+        rows = self.instance if self.many else [self.instance]
+        genres = self.get_genres(rows) if 'genre' in self.title_fields else {}
+        results = [self.to_representation(row, genres) for row in rows]
+        return results if self.many else results[0]
+
+
+class TitleDetailSerializer(TitleGetSerializer):
+    """
+    Сериализатор на чтение для отдельного произведения с последними
+    отзывами.
+    """
+
+    reviews_preview = serializers.SerializerMethodField()
+
+    class Meta(TitleGetSerializer.Meta):
+        fields = TitleGetSerializer.Meta.fields + ('reviews_preview',)
+
+    def get_reviews_preview(self, obj):
+        reviews = obj.reviews.select_related('author').order_by(
+            '-pub_date', '-id'
+        )[: self.context['reviews_preview']]
+        return ReviewSerializer(reviews, many=True).data
+
+
+class RatingDistributionSerializer(serializers.ModelSerializer):
+    """Сериализатор распределения оценок произведения."""
+
+    distribution = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Title
+        fields = ('id', 'rating', 'reviews_count', 'distribution')
+
+    def get_distribution(self, obj):
+        return [
+            {'score': score, 'count': getattr(obj, score_count_field(score))}
+            for score in range(const.MIN_SCORE, const.MAX_SCORE + 1)
+        ]
+
+
+class TitleQueryParamsSerializer(serializers.Serializer):
+    """Сериализатор для параметров запроса к произведениям."""
+
+    reviews_preview = serializers.IntegerField(
+        min_value=1, max_value=const.MAX_REVIEWS_PREVIEW, required=False
+    )
+    fields = serializers.CharField(required=False)
+    omit = serializers.CharField(required=False)
+
+    def validate_field_names(self, value):
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(TitleGetSerializer.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            )
+        return names
+
+    def validate_fields(self, value):
+        return self.validate_field_names(value)
+
+    def validate_omit(self, value):
+        return self.validate_field_names(value)
+
+    def validate(self, attrs):
+        fields = attrs.pop('fields', None)
+        omit = attrs.pop('omit', set())
+        attrs['title_fields'] = tuple(
+            name
+            for name in TitleGetSerializer.Meta.fields
+            if (fields is None or name in fields) and name not in omit
+        )
+        return attrs
+
+
+class TopTitlesQueryParamsSerializer(serializers.Serializer):
+    """Сериализатор для параметров запроса лучших произведений."""
+
+    genre = serializers.SlugField(required=False)
+    category = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=const.MAX_TOP_TITLES,
+        default=const.TOP_TITLES_LIMIT,
+    )
+
+
+class SlugManyRelatedField(serializers.ManyRelatedField):
+    """
+    Список объектов по слагам, которые загружаются одним запросом.
+    Ненайденные элементы, как и в ManyRelatedField, передаются в
+    `to_internal_value` дочернего поля, поэтому ошибки совпадают с
+    ошибками SlugRelatedField.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        slugs = [
+            None if item is None else smart_str(item) for item in data
+        ]
+        objects = {
+            smart_str(getattr(obj, child.slug_field)): obj
+            for obj in child.get_queryset().filter(
+                **{f'{child.slug_field}__in': set(slugs) - {None}}
+            )
+        }
+        return [
+            objects[slug] if slug in objects
+            else child.to_internal_value(item)
+            for slug, item in zip(slugs, data)
+        ]
+
+
+class BatchedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который при many=True разрешает слаги пакетом."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return SlugManyRelatedField(**list_kwargs)
 
 
 class TitleSerializer(TitleGetSerializer):
@@ -101,7 +328,7 @@ class TitleSerializer(TitleGetSerializer):
     Сериализатор на запись для модели Title.
     """
 
-    genre = serializers.SlugRelatedField(
+    genre = BatchedSlugRelatedField(
         slug_field='slug',
         many=True,
         queryset=Genre.objects.all(),
@@ -138,26 +365,35 @@ class ReviewSerializer(serializers.ModelSerializer):
         ]
     )
 
-    def validate(self, data):
-        """Запрещает пользователям оставлять повторные отзывы."""
-        request = self.context.get('request')
-        view = self.context.get('view')
-
-        if request and request.method == 'POST':
-            author = request.user
-            title_id = view.kwargs.get('title_id')
-            if Review.objects.filter(
-                title_id=title_id, author=author
+    def create(self, validated_data):
+        """
+        Запрещает пользователям оставлять повторные отзывы. Повтор
+        отсекает ограничение unique_review в базе, что надежно и при
+        одновременных запросах, а наличие отзыва проверяется только после
+        ошибки вставки.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author'],
             ).exists():
-                raise serializers.ValidationError(
-                    'Нельзя добавить больше 1 отзыва на произведение.',
-                    code='unique',
-                )
-        return data
+                raise
+        raise serializers.ValidationError(
+            {
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя добавить больше 1 отзыва на произведение.'
+                ]
+            },
+            code='unique',
+        )
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comments_count'
+        )
         read_only_fields = ('author',)
 
 
@@ -172,3 +408,117 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
         read_only_fields = ('author',)
+
+
+class ReviewSearchSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор найденных отзывов с фрагментом текста. Фрагмент
+    экранируется как HTML, и только после этого совпадения выделяются
+    тегом `<mark>`.
+    """
+
+    author = serializers.SlugRelatedField(
+        slug_field='username', read_only=True
+    )
+    snippet = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Review
+        fields = ('id', 'title', 'author', 'score', 'pub_date', 'snippet')
+
+    def get_snippet(self, obj):
+        start, end = SNIPPET_MARKERS
+        return (
+            escape(obj.snippet)
+            .replace(start, '<mark>')
+            .replace(end, '</mark>')
+        )
+
+
+class ReviewSearchQueryParamsSerializer(serializers.Serializer):
+    """Сериализатор для параметров поиска отзывов."""
+
+    search = serializers.CharField()
+
+
+class UserSearchQueryParamsSerializer(serializers.Serializer):
+    """
+    Сериализатор для параметров поиска пользователей: `match=prefix` ищет
+    по началу имени, `match=contains` - по любой подстроке.
+    """
+
+    search = serializers.CharField(required=False, allow_blank=True)
+    match = serializers.ChoiceField(
+        choices=(const.USER_SEARCH_PREFIX, const.USER_SEARCH_CONTAINS),
+        default=const.USER_SEARCH_PREFIX,
+    )
+
+
+class ReviewBulkItemSerializer(serializers.Serializer):
+    """
+    Сериализатор строки пакетной загрузки отзывов. Переводит коды ошибок
+    `import_reviews` в ошибки полей строки.
+    """
+
+    import_errors = {
+        IMPORT_TITLE_NOT_FOUND: ('title', 'Произведение не найдено.'),
+        IMPORT_AUTHOR_NOT_FOUND: ('author', 'Пользователь не найден.'),
+        IMPORT_DUPLICATE_REVIEW: (
+            api_settings.NON_FIELD_ERRORS_KEY,
+            'Нельзя добавить больше 1 отзыва на произведение.',
+        ),
+    }
+
+    title = serializers.IntegerField()
+    author = serializers.CharField()
+    text = serializers.CharField()
+    score = serializers.IntegerField(
+        validators=[
+            MinValueValidator(const.MIN_SCORE),
+            MaxValueValidator(const.MAX_SCORE),
+        ]
+    )
+
+    @classmethod
+    def get_import_errors(cls, code: str) -> dict:
+        field, message = cls.import_errors[code]
+        return {field: [message]}
+
+
+class ReviewExportQueryParamsSerializer(serializers.Serializer):
+    """Сериализатор для параметров выгрузки отзывов."""
+
+    comments = serializers.BooleanField(default=False)
+
+
+class ActivitySerializer(serializers.BaseSerializer):
+    """
+    Сериализатор записи ленты активности: пары из вида записи (`review`
+    или `comment`) и отзыва или комментария.
+    """
+
+    date_field = serializers.DateTimeField()
+
+    def to_representation(self, instance):
+        kind, obj = instance
+        review = obj if kind == 'review' else obj.review
+        data = {
+            'type': kind,
+            'id': obj.id,
+            'title': {'id': review.title.id, 'name': review.title.name},
+            'author': obj.author.username,
+            'text': obj.text,
+            'pub_date': self.date_field.to_representation(obj.pub_date),
+        }
+        if kind == 'review':
+            data['score'] = obj.score
+        else:
+            data['review'] = review.id
+        return data
+
+
+class ActivityQueryParamsSerializer(serializers.Serializer):
+    """Сериализатор для параметров ленты активности."""
+
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
@@ -0,0 +1,97 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+
+from api.cache import bump_generation
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.utils import get_deletion_batch
+
+# Пространства имен кеша, которые зависят от записей каждой модели.
+CACHE_DEPENDENCIES = {
+    Title: ('title-counts', 'titles'),
+    Title.genre.through: ('title-counts', 'titles'),
+    Genre: ('title-counts', 'titles', 'genres'),
+    Category: ('title-counts', 'titles', 'categories'),
+    Review: ('titles',),
+    # Последние отзывы в карточке произведения выводят счетчик комментариев.
+    Comment: ('title-previews',),
+}
+
+
+def invalidate_cache(sender, **kwargs):
+    """Сдвигает поколения кеша, зависящие от измененной модели."""
+    if kwargs.get('action', 'post').startswith('pre'):
+        return
+    bump_generation(*CACHE_DEPENDENCIES[sender])
+
+
+def invalidate_title_reviews(sender, instance, **kwargs):
+    """Сдвигает версию списка отзывов произведения."""
+    if sender is Title:
+        title_id = instance.pk
+    elif sender is Comment:
+        # В отзывах выводится счетчик комментариев. При пакетном удалении
+        # версии сдвигает BatchedDestroyMixin по измененным произведениям.
+        if get_deletion_batch() is not None:
+            return
+        title_id = instance.review.title_id
+    else:
+        title_id = instance.title_id
+    bump_generation(f'reviews:{title_id}')
+
+
+def remember_username(sender, instance, raw, update_fields, **kwargs):
+    """Запоминает имя пользователя до его изменения."""
+    instance._previous_username = None
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    if instance.pk and not raw:
+        instance._previous_username = (
+            User.objects.filter(pk=instance.pk)
+            .values_list('username', flat=True)
+            .first()
+        )
+
+
+def invalidate_author_reviews(sender, instance, raw, **kwargs):
+    """
+    Сдвигает версии списков отзывов произведений, в отзывах и комментариях
+    которых выводится измененное имя пользователя.
+    """
+    previous = getattr(instance, '_previous_username', None)
+    if raw or previous is None or previous == instance.username:
+        return
+    title_ids = set(
+        Review.objects.filter(author=instance).values_list(
+            'title_id', flat=True
+        )
+    )
+    title_ids.update(
+        Comment.objects.filter(author=instance).values_list(
+            'review__title_id', flat=True
+        )
+    )
+    if title_ids:
+        # Последние отзывы встраиваются и в карточку произведения.
+        bump_generation(
+            'titles', *(f'reviews:{title_id}' for title_id in title_ids)
+        )
+
+
+pre_save.connect(remember_username, sender=User)
+post_save.connect(invalidate_author_reviews, sender=User)
+post_save.connect(invalidate_title_reviews, sender=Review)
+post_delete.connect(invalidate_title_reviews, sender=Review)
+post_delete.connect(invalidate_title_reviews, sender=Title)
+post_save.connect(invalidate_title_reviews, sender=Comment)
+post_delete.connect(invalidate_title_reviews, sender=Comment)
+
+for model in CACHE_DEPENDENCIES:
+    if model is Title.genre.through:
+        m2m_changed.connect(invalidate_cache, sender=model)
+        continue
+    post_save.connect(invalidate_cache, sender=model)
+    post_delete.connect(invalidate_cache, sender=model)
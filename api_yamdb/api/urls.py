@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, SignUpAPIView, TitleViewSet,
-                       TokenAccessObtainView, UserViewSet)
+from api.views import (ActivityAPIView, CacheStatsAPIView, CategoryViewSet,
+                       CommentViewSet, GenreViewSet, ReviewBulkAPIView,
+                       ReviewSearchViewSet, ReviewViewSet, SignUpAPIView,
+                       TitleViewSet, TokenAccessObtainView, UserViewSet)
 
 router_v1 = SimpleRouter()
 
@@ -11,6 +12,9 @@ router_v1.register('users', UserViewSet)
 router_v1.register('titles', TitleViewSet, basename='title')
 router_v1.register('genres', GenreViewSet, basename='genre')
 router_v1.register('categories', CategoryViewSet, basename='category')
+router_v1.register(
+    'reviews/search', ReviewSearchViewSet, basename='review-search'
+)
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews', ReviewViewSet, basename='review'
 )
@@ -34,5 +38,10 @@ urlpatterns = [
         UserViewSet.as_view({'get': 'me', 'patch': 'me_update'}),
         name='users_me',
     ),
+    path('v1/cache-stats/', CacheStatsAPIView.as_view(), name='cache_stats'),
+    path('v1/activity/', ActivityAPIView.as_view(), name='activity'),
+    path(
+        'v1/reviews/bulk/', ReviewBulkAPIView.as_view(), name='reviews_bulk'
+    ),
     path('v1/', include(router_v1.urls)),
 ]
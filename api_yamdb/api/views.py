@@ -1,35 +1,89 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.db.models import Case, When
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, status
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
 from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 from rest_framework_simplejwt.tokens import AccessToken
 
-from api.filters import TitleFilterSet
+from api import const
+from api.cache import ModelSnapshot, bump_generation, get_cache_stats
+from api.export import (
+    REVIEW_COMMENT_EXPORT_FIELDS,
+    REVIEW_EXPORT_FIELDS,
+    flatten_reviews,
+    iter_title_reviews,
+)
+from api.filters import (
+    TitleFilterSet,
+    TitleOrderingFilter,
+    filter_by_title_taxonomy,
+)
+from api.mixins import (
+    BatchedDestroyMixin,
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    SnapshotListMixin,
+)
+from api.pagination import (
+    ActivityPagination,
+    ReviewCommentPagination,
+    TitlePagination,
+)
+from api.parsers import NDJSONParser
 from api.permissions import (
+    IsAdminOrModerator,
     IsAdminOrOwnerOrReadOnly,
     IsAdminOrReadOnly,
     IsAdminOrSuperuser,
 )
+from api.renderers import CSVRenderer, NDJSONRenderer
 from api.serializers import (
+    ActivityQueryParamsSerializer,
+    ActivitySerializer,
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
+    RatingDistributionSerializer,
+    ReviewBulkItemSerializer,
+    ReviewExportQueryParamsSerializer,
+    ReviewSearchQueryParamsSerializer,
+    ReviewSearchSerializer,
     ReviewSerializer,
     SignUpSerializer,
+    TitleDetailSerializer,
     TitleGetSerializer,
+    TitleQueryParamsSerializer,
     TitleSerializer,
+    TitleValuesSerializer,
     TokenAccessObtainSerializer,
+    TopTitlesQueryParamsSerializer,
+    UserSearchQueryParamsSerializer,
     UserSerializer,
 )
 from api.utils import send_confirmation_code
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import (
+    SCORE_COUNT_FIELDS,
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    User,
+)
+from reviews.search import search_reviews, search_users
+from reviews.utils import get_top_title_ids, import_reviews
 
 
 class SignUpAPIView(APIView):
@@ -76,14 +130,21 @@ class TokenAccessObtainView(APIView):
         )
 
 
-class UserViewSet(ModelViewSet):
+class CacheStatsAPIView(APIView):
+    """Возвращает счетчики попаданий в кеш ответов каталога."""
+
+    permission_classes = (IsAdminOrSuperuser,)
+
+    def get(self, request):
+        return Response(get_cache_stats(), status=status.HTTP_200_OK)
+
+
+class UserViewSet(BatchedDestroyMixin, ModelViewSet):
     """Обрабатывает запросы к данным пользователей."""
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdminOrSuperuser,)
-    filter_backends = (SearchFilter,)
-    search_fields = ('username',)
     lookup_field = 'username'
     http_method_names = (
         'get',
@@ -99,6 +160,27 @@ class UserViewSet(ModelViewSet):
             ]
         return super().get_permissions()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        params = UserSearchQueryParamsSerializer(
+            data=self.request.query_params
+        )
+        params.is_valid(raise_exception=True)
+        search = params.validated_data.get('search')
+        if not search:
+            return queryset
+        # Порядок совпадает с индексом, по которому идет поиск, поэтому
+        # страница результатов читается без сортировки.
+        if params.validated_data['match'] == const.USER_SEARCH_CONTAINS:
+            return search_users(queryset, search, contains=True).order_by(
+                'id'
+            )
+        return search_users(queryset, search).order_by(
+            'username_normalized', 'id'
+        )
+
     @action(methods=['get'], detail=False, url_name='me')
     def me(self, request):
         serializer = self.get_serializer(request.user)
@@ -116,12 +198,16 @@ class UserViewSet(ModelViewSet):
 
 
 class CategoryGenre(
+    CachedResponseMixin,
+    SnapshotListMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
     mixins.DestroyModelMixin,
     GenericViewSet,
 ):
-    """Класс для работы с категориями и жанрами."""
+    """
+    Класс для работы с категориями и жанрами. Список, поиск и пагинация
+    обслуживаются из снимка в памяти процесса.
+    """
 
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
@@ -134,6 +220,8 @@ class CategoryViewSet(CategoryGenre):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_namespace = 'categories'
+    snapshot = ModelSnapshot(queryset, serializer_class, cache_namespace)
 
 
 class GenreViewSet(CategoryGenre):
@@ -141,9 +229,11 @@ class GenreViewSet(CategoryGenre):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_namespace = 'genres'
+    snapshot = ModelSnapshot(queryset, serializer_class, cache_namespace)
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(BatchedDestroyMixin, CachedResponseMixin, ModelViewSet):
     """ViewSet для работы с объектами модели Title."""
 
     queryset = Title.objects.all()
@@ -156,24 +246,117 @@ class TitleViewSet(ModelViewSet):
     )
     filter_backends = (
         DjangoFilterBackend,
-        OrderingFilter,
+        TitleOrderingFilter,
     )
     filterset_class = TitleFilterSet
+    ordering_fields = ('year', 'name', 'rating')
+    pagination_class = TitlePagination
+    cache_namespace = 'titles'
+
+    @cached_property
+    def title_query_params(self):
+        serializer = TitleQueryParamsSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    @property
+    def with_reviews_preview(self):
+        return (
+            self.action == 'retrieve'
+            and 'reviews_preview' in self.title_query_params
+        )
+
+    def get_cache_namespace(self):
+        # Последние отзывы меняются с каждым комментарием, поэтому ответы с
+        # ними живут в отдельном пространстве имен.
+        if self.with_reviews_preview:
+            return 'title-previews'
+        return super().get_cache_namespace()
 
     def get_serializer_class(self):
+        if self.request.method != 'GET':
+            return TitleSerializer
+        if self.with_reviews_preview:
+            return TitleDetailSerializer
+        if settings.FAST_TITLE_SERIALIZER:
+            return TitleValuesSerializer
+        return TitleGetSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
         if self.request.method == 'GET':
-            return TitleGetSerializer
-        return TitleSerializer
+            context.update(self.title_query_params)
+        return context
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    @action(
+        methods=('get',),
+        detail=True,
+        url_path='rating-distribution',
+        url_name='rating-distribution',
+    )
+    def rating_distribution(self, request, pk=None):
+        return self.get_conditional_response(
+            self.get_rating_distribution, request, pk=pk
+        )
+
+    def get_rating_distribution(self, request, pk=None):
+        title = get_object_or_404(
+            Title.objects.only('rating', 'reviews_count', *SCORE_COUNT_FIELDS),
+            pk=pk,
+        )
+        serializer = RatingDistributionSerializer(title)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(methods=('get',), detail=False, url_path='top', url_name='top')
+    def top(self, request):
+        return self.get_conditional_response(self.get_top, request)
+
+    def get_top(self, request):
+        params = TopTitlesQueryParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        title_ids = get_top_title_ids(**params.validated_data)
+        titles = (
+            self.get_queryset()
+            .filter(pk__in=title_ids)
+            .order_by(
+                Case(
+                    *(
+                        When(pk=title_id, then=position)
+                        for position, title_id in enumerate(title_ids)
+                    ),
+                    default=len(title_ids),
+                )
+            )
+        )
+        serializer = self.get_serializer(titles, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
     def get_queryset(self):
-        return (
-            Title.objects.prefetch_related('reviews')
-            .annotate(rating=Avg('reviews__score'))
-            .order_by('name')
+        queryset = Title.objects.order_by('name', 'id')
+        if self.request.method != 'GET':
+            return queryset.select_related('category').prefetch_related(
+                'genre'
+            )
+        # Запрашиваются только колонки и связи выбранных полей ответа и
+        # название, по которому строится курсор пагинации.
+        title_fields = self.title_query_params['title_fields']
+        if self.get_serializer_class() is TitleValuesSerializer:
+            return TitleValuesSerializer.get_values(queryset, title_fields)
+        if 'category' in title_fields:
+            queryset = queryset.select_related('category')
+        if 'genre' in title_fields:
+            queryset = queryset.prefetch_related('genre')
+        return queryset.only(
+            'id', 'name', *(name for name in title_fields if name != 'genre')
         )
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ModelViewSet):
     """Вьюсет для работы с отзывами."""
 
     http_method_names = (
@@ -184,20 +367,141 @@ class ReviewViewSet(ModelViewSet):
     )
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminOrOwnerOrReadOnly,)
+    pagination_class = ReviewCommentPagination
 
-    def get_title(self):
+    def get_cache_namespace(self):
+        return f'reviews:{self.kwargs.get("title_id")}'
+
+    @cached_property
+    def title(self):
+        # Для отзывов нужен только id произведения и проверка, что оно
+        # существует.
         return get_object_or_404(
-            Title.objects.select_related('category'),
-            id=self.kwargs.get('title_id'),
+            Title.objects.only('id'), id=self.kwargs.get('title_id')
         )
 
     def get_queryset(self):
-        return self.get_title().reviews.select_related('author')
+        return self.title.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            title=self.get_title(),
+        serializer.save(author=self.request.user, title=self.title)
+
+    @action(
+        detail=False,
+        url_path='export',
+        renderer_classes=(NDJSONRenderer, CSVRenderer),
+    )
+    def export(self, request, title_id=None):
+        """
+        Отдает потоком все отзывы произведения в NDJSON или CSV, по
+        параметру `comments=true` - вместе с комментариями.
+        """
+        params = ReviewExportQueryParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        with_comments = params.validated_data['comments']
+        rows = iter_title_reviews(self.title.id, with_comments)
+        renderer = request.accepted_renderer
+        fields = None
+        if renderer.format == CSVRenderer.format:
+            fields = REVIEW_EXPORT_FIELDS
+            if with_comments:
+                rows = flatten_reviews(rows)
+                fields = REVIEW_COMMENT_EXPORT_FIELDS
+        response = StreamingHttpResponse(
+            renderer.render_rows(rows, fields),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="title-{self.title.id}-reviews.'
+            f'{renderer.format}"'
+        )
+        return response
+
+
+class ReviewBulkAPIView(APIView):
+    """
+    Пакетная загрузка отзывов по разным произведениям: JSON-массив или
+    NDJSON. Корректные строки создаются одной вставкой, для каждой строки
+    возвращается id отзыва или ошибки.
+    """
+
+    permission_classes = (IsAdminOrSuperuser,)
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            raise ValidationError('Ожидается непустой список отзывов.')
+        if len(rows) > const.MAX_BULK_REVIEWS:
+            raise ValidationError(
+                f'За один запрос можно загрузить не больше '
+                f'{const.MAX_BULK_REVIEWS} отзывов.'
+            )
+        results = [None] * len(rows)
+        valid_indexes = []
+        valid_rows = []
+        for index, row in enumerate(rows):
+            serializer = ReviewBulkItemSerializer(data=row)
+            if serializer.is_valid():
+                valid_indexes.append(index)
+                valid_rows.append(serializer.validated_data)
+            else:
+                results[index] = {'errors': serializer.errors}
+        try:
+            imported = import_reviews(valid_rows) if valid_rows else []
+        except IntegrityError:
+            return Response(
+                {
+                    'detail': 'Отзывы изменились во время загрузки, '
+                    'повторите запрос.'
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        title_ids = set()
+        for index, row, result in zip(valid_indexes, valid_rows, imported):
+            if 'error' in result:
+                results[index] = {
+                    'errors': ReviewBulkItemSerializer.get_import_errors(
+                        result['error']
+                    )
+                }
+                continue
+            results[index] = result
+            title_ids.add(row['title'])
+        # bulk_create не вызывает сигналы, поэтому кеш сбрасывается здесь.
+        if title_ids:
+            bump_generation(
+                'titles', *(f'reviews:{title_id}' for title_id in title_ids)
+            )
+        created = sum('id' in result for result in results)
+        return Response(
+            {
+                'created': created,
+                'failed': len(rows) - created,
+                'results': [
+                    {'index': index, **result}
+                    for index, result in enumerate(results)
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReviewSearchViewSet(mixins.ListModelMixin, GenericViewSet):
+    """Полнотекстовый поиск отзывов по всем произведениям."""
+
+    serializer_class = ReviewSearchSerializer
+    permission_classes = (IsAdminOrModerator,)
+
+    def get_queryset(self):
+        params = ReviewSearchQueryParamsSerializer(
+            data=self.request.query_params
+        )
+        params.is_valid(raise_exception=True)
+        return search_reviews(
+            Review.objects.select_related('author'),
+            params.validated_data['search'],
         )
 
 
@@ -212,23 +516,53 @@ class CommentViewSet(ModelViewSet):
     )
     serializer_class = CommentSerializer
     permission_classes = (IsAdminOrOwnerOrReadOnly,)
+    pagination_class = ReviewCommentPagination
 
-    def get_review(self):
+    @cached_property
+    def review(self):
+        # Отзыв нужен только для проверки, что он существует и относится к
+        # произведению из адреса: это поиск по первичному ключу.
         return get_object_or_404(
-            Review.objects.select_related('author', 'title'),
+            Review.objects.only('id', 'title_id'),
             id=self.kwargs.get('review_id'),
             title_id=self.kwargs.get('title_id'),
         )
 
     def get_queryset(self):
-        return (
-            self.get_review()
-            .comments.select_related('author')
-            .prefetch_related('review')
-        )
+        return self.review.comments.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            review=self.get_review(),
+        serializer.save(author=self.request.user, review=self.review)
+
+
+class ActivityAPIView(APIView):
+    """
+    Лента последних отзывов и комментариев по всем произведениям с
+    курсорной пагинацией и фильтрами по категории и жанру произведения.
+    """
+
+    def get(self, request):
+        params = ActivityQueryParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        reviews = Review.objects.select_related('author', 'title').only(
+            'id', 'text', 'score', 'pub_date', 'author__username',
+            'title__name',
+        )
+        comments = Comment.objects.select_related(
+            'author', 'review__title'
+        ).only(
+            'id', 'text', 'pub_date', 'author__username', 'review__title__name'
+        )
+        streams = {
+            'review': filter_by_title_taxonomy(
+                reviews, 'title', **params.validated_data
+            ),
+            'comment': filter_by_title_taxonomy(
+                comments, 'review__title', **params.validated_data
+            ),
+        }
+        paginator = ActivityPagination()
+        page = paginator.paginate_streams(streams, request)
+        return paginator.get_paginated_response(
+            ActivitySerializer(page, many=True).data
         )
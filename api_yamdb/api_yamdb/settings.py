@@ -68,6 +68,16 @@ DATABASES = {
     }
 }
 
+# Cache
+# В конфигурации с несколькими процессами нужен общий бэкенд кеша
+# (Redis, Memcached), иначе поколения кеша не согласованы между процессами.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -107,6 +117,10 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
+# Списки и карточки произведений строятся из строк values() без полей
+# ModelSerializer; False возвращает сериализацию через TitleGetSerializer.
+FAST_TITLE_SERIALIZER = True
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -90,6 +90,7 @@ class TitleAdmin(admin.ModelAdmin):
         'year',
         'category',
         'genres',
+        'rating',
     )
 
     @admin.display(description='Жанры')
@@ -0,0 +1,79 @@
+# Generated by Django 3.2 on 2026-10-17 04:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_genre_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreRating = apps.get_model('reviews', 'GenreRating')
+    GenreRating.objects.bulk_create(
+        GenreRating(
+            genre_id=genre_id,
+            title_id=title_id,
+            category_id=category_id,
+            rating=rating,
+        )
+        for genre_id, title_id, category_id, rating in (
+            Title.genre.through.objects.values_list(
+                'genre_id', 'title_id', 'title__category_id', 'title__rating'
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_score_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(null=True, verbose_name='Рейтинг')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг в жанре',
+                'verbose_name_plural': 'Рейтинги в жанрах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'rating', 'id'], name='title_category_rating_idx'),
+        ),
+        migrations.AddField(
+            model_name='genrerating',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.category', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='genrerating',
+            name='genre',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='reviews.genre', verbose_name='Жанр'),
+        ),
+        migrations.AddField(
+            model_name='genrerating',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='genre_ratings', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='genrerating',
+            index=models.Index(fields=['genre', 'rating', 'title'], name='genre_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genrerating',
+            index=models.Index(fields=['genre', 'category', 'rating', 'title'], name='genre_category_rating_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='genrerating',
+            constraint=models.UniqueConstraint(fields=('genre', 'title'), name='unique_genre_rating'),
+        ),
+        migrations.RunPython(fill_genre_ratings, migrations.RunPython.noop),
+    ]
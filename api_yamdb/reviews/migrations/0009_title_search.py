@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-17 04:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.models
+from reviews.search import (
+    TITLE_SEARCH_INDEX,
+    is_search_supported,
+    rebuild_search_index,
+    uninstall_search_index,
+)
+
+
+def create_title_search(apps, schema_editor):
+    if is_search_supported(schema_editor.connection):
+        rebuild_search_index(TITLE_SEARCH_INDEX, schema_editor.connection)
+
+
+def drop_title_search(apps, schema_editor):
+    if is_search_supported(schema_editor.connection):
+        uninstall_search_index(TITLE_SEARCH_INDEX, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_genre_ratings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.title')),
+                ('document', reviews.models.FullTextField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_title_search, drop_title_search),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-17 04:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.models
+from reviews.search import (
+    REVIEW_SEARCH_INDEX,
+    is_search_supported,
+    rebuild_search_index,
+    uninstall_search_index,
+)
+
+
+def create_review_search(apps, schema_editor):
+    if is_search_supported(schema_editor.connection):
+        rebuild_search_index(REVIEW_SEARCH_INDEX, schema_editor.connection)
+
+
+def drop_review_search(apps, schema_editor):
+    if is_search_supported(schema_editor.connection):
+        uninstall_search_index(REVIEW_SEARCH_INDEX, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSearch',
+            fields=[
+                ('review', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.review')),
+                ('document', reviews.models.FullTextField(db_column='reviews_review_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_review_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_review_search, drop_review_search),
+    ]
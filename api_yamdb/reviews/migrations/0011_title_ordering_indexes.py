@@ -0,0 +1,56 @@
+# Generated by Django 3.2 on 2026-10-17 04:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.validators
+from reviews.search import (
+    TITLE_SEARCH_INDEX,
+    install_search_index,
+    is_search_supported,
+)
+
+
+def reinstall_title_search(apps, schema_editor):
+    # SQLite пересоздает таблицу произведений при изменении полей и удаляет
+    # вместе с ней триггеры поискового индекса.
+    if is_search_supported(schema_editor.connection):
+        install_search_index(TITLE_SEARCH_INDEX, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_review_search'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='title',
+            options={'ordering': ('name', 'id'), 'verbose_name': 'Произведение', 'verbose_name_plural': 'Произведения'},
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='category',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='titles', to='reviews.category', verbose_name='Категория'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.SmallIntegerField(validators=[reviews.validators.year_not_in_future], verbose_name='Год издания'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'name', 'id'], name='title_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year', 'id'], name='title_category_year_idx'),
+        ),
+        migrations.RunPython(
+            reinstall_title_search, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-17 05:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from reviews.search import (
+    REVIEW_SEARCH_INDEX,
+    install_search_index,
+    is_search_supported,
+)
+
+
+def fill_comments_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = (
+        Comment.objects.filter(review=OuterRef('pk'))
+        .order_by()
+        .values('review')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Review.objects.update(comments_count=Coalesce(Subquery(comments), 0))
+
+
+def reinstall_review_search(apps, schema_editor):
+    # SQLite пересоздает таблицу отзывов при добавлении поля и удаляет
+    # вместе с ней триггеры поискового индекса.
+    if is_search_supported(schema_editor.connection):
+        install_search_index(REVIEW_SEARCH_INDEX, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_name_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_review_search, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from reviews.const import (
     MAX_DESCRIPTION_LENGTH,
@@ -14,6 +14,30 @@ from reviews.validators import year_not_in_future
 User = get_user_model()
 
 
+def score_count_field(score: int) -> str:
+    """Возвращает имя поля счетчика отзывов с оценкой `score`."""
+    return f'score_{score}_count'
+
+
+SCORE_COUNT_FIELDS = tuple(
+    score_count_field(score) for score in range(MIN_SCORE, MAX_SCORE + 1)
+)
+TITLE_COUNTER_FIELDS = (
+    'score_sum',
+    'reviews_count',
+    'rating',
+) + SCORE_COUNT_FIELDS
+
+
+def score_count(score: int) -> models.PositiveIntegerField:
+    """Возвращает поле счетчика отзывов с оценкой `score`."""
+    return models.PositiveIntegerField(
+        verbose_name=f'Количество оценок {score}',
+        default=0,
+        editable=False,
+    )
+
+
 class BaseNameSlug(models.Model):
     name = models.CharField(
         verbose_name='Название',
@@ -28,6 +52,11 @@ class BaseNameSlug(models.Model):
     class Meta:
         abstract = True
         ordering = ('name',)
+        indexes = [
+            models.Index(
+                fields=('name',), name='%(app_label)s_%(class)s_name_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -66,7 +95,6 @@ class Title(models.Model):
         validators=[
             year_not_in_future,
         ],
-        db_index=True,
     )
 
     category = models.ForeignKey(
@@ -75,21 +103,173 @@ class Title(models.Model):
         null=True,
         related_name='titles',
         verbose_name='Категория',
+        db_index=False,
     )
     genre = models.ManyToManyField(
         Genre,
         related_name='genres',
         verbose_name='Жанр',
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    # Гистограмма оценок: по счетчику на каждое значение от MIN_SCORE до
+    # MAX_SCORE, обновляется вместе с рейтингом.
+    score_1_count = score_count(1)
+    score_2_count = score_count(2)
+    score_3_count = score_count(3)
+    score_4_count = score_count(4)
+    score_5_count = score_count(5)
+    score_6_count = score_count(6)
+    score_7_count = score_count(7)
+    score_8_count = score_count(8)
+    score_9_count = score_count(9)
+    score_10_count = score_count(10)
 
     class Meta:
-        ordering = ('category', 'name')
+        ordering = ('name', 'id')
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Индексы покрывают фильтр по категории вместе с каждой доступной
+        # сортировкой, id в конце делает порядок однозначным.
+        indexes = [
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_id_idx'),
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            models.Index(
+                fields=('category', 'name', 'id'),
+                name='title_category_name_idx',
+            ),
+            models.Index(
+                fields=('category', 'year', 'id'),
+                name='title_category_year_idx',
+            ),
+            models.Index(
+                fields=('category', 'rating', 'id'),
+                name='title_category_rating_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.name}, {str(self.year)}, {self.category}'
 
+    def save(self, *args, **kwargs):
+        # Счетчики рейтинга изменяются только атомарными UPDATE-запросами,
+        # поэтому при сохранении существующего произведения они не
+        # перезаписываются значениями, прочитанными из базы ранее.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in TITLE_COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class FullTextField(models.TextField):
+    """Скрытый столбец таблицы FTS5 с именем самой таблицы."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    """Полнотекстовый поиск оператором MATCH по таблице FTS5."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class TitleSearch(models.Model):
+    """
+    Полнотекстовый индекс FTS5 по названиям и описаниям произведений.
+    Таблица создается миграцией и обновляется триггерами базы данных.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    document = FullTextField(db_column='reviews_title_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+
+
+class GenreRating(models.Model):
+    """
+    Рейтинг произведения в жанре. Дублирует связь произведения с жанром
+    вместе с категорией и рейтингом произведения, чтобы лучшие произведения
+    жанра выбирались по индексу без соединения и сортировки всего каталога.
+    """
+
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='ratings',
+        verbose_name='Жанр',
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='genre_ratings',
+        verbose_name='Произведение',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Категория',
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг в жанре'
+        verbose_name_plural = 'Рейтинги в жанрах'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('genre', 'title'), name='unique_genre_rating'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('genre', 'rating', 'title'),
+                name='genre_rating_idx',
+            ),
+            models.Index(
+                fields=('genre', 'category', 'rating', 'title'),
+                name='genre_category_rating_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.genre}: {self.title}'
+
 
 class ReviewCommentModel(models.Model):
     """Абстрактная модель для отзывов и комментариев."""
@@ -113,6 +293,13 @@ class ReviewCommentModel(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        # Оценки произведения и счетчики комментариев пересчитываются в
+        # сигналах, поэтому запись и обновление счетчиков выполняются в
+        # одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Review(ReviewCommentModel):
     """Модель для отзывов пользователей на произведения."""
@@ -134,6 +321,11 @@ class Review(ReviewCommentModel):
             ),
         ],
     )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta(ReviewCommentModel.Meta):
         verbose_name = 'Отзыв'
@@ -143,6 +335,12 @@ class Review(ReviewCommentModel):
                 fields=('title', 'author'), name='unique_review'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+        ]
 
 
 class Comment(ReviewCommentModel):
@@ -158,3 +356,30 @@ class Comment(ReviewCommentModel):
     class Meta(ReviewCommentModel.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+        ]
+
+
+class ReviewSearch(models.Model):
+    """
+    Полнотекстовый индекс FTS5 по текстам отзывов. Таблица создается
+    миграцией и обновляется триггерами базы данных.
+    """
+
+    review = models.OneToOneField(
+        Review,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    document = FullTextField(db_column='reviews_review_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_review_fts'
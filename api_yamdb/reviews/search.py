@@ -0,0 +1,211 @@
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+SearchIndex = namedtuple(
+    'SearchIndex',
+    ('table', 'content_table', 'columns', 'rank', 'options'),
+    # Префиксные индексы ускоряют запросы по началу слова.
+    defaults=("prefix='2 3'",),
+)
+
+# Название весит в ранжировании больше описания.
+TITLE_SEARCH_INDEX = SearchIndex(
+    'reviews_title_fts',
+    'reviews_title',
+    ('name', 'description'),
+    'bm25(10.0, 1.0)',
+)
+REVIEW_SEARCH_INDEX = SearchIndex(
+    'reviews_review_fts', 'reviews_review', ('text',), 'bm25()'
+)
+# Триграммы позволяют искать по любой подстроке имени пользователя.
+USER_SEARCH_INDEX = SearchIndex(
+    'users_customuser_fts',
+    'users_customuser',
+    ('username_normalized',),
+    'bm25()',
+    "tokenize='trigram'",
+)
+SEARCH_INDEXES = (TITLE_SEARCH_INDEX, REVIEW_SEARCH_INDEX, USER_SEARCH_INDEX)
+TRIGRAM_MIN_LENGTH = 3
+# Токенизатор trigram появился в SQLite 3.34.
+MIN_SQLITE_VERSION = (3, 34)
+
+# Совпадения отмечаются управляющими символами, а не HTML-тегами: текст
+# отзыва экранируется перед заменой меток на теги при выводе.
+SNIPPET_MARKERS = ('\x02', '\x03')
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_TOKENS = 16
+
+
+def is_search_supported(db_connection=connection) -> bool:
+    """Проверяет, что база данных поддерживает индексы FTS5."""
+    return (
+        db_connection.vendor == 'sqlite'
+        and db_connection.Database.sqlite_version_info >= MIN_SQLITE_VERSION
+    )
+
+
+def install_search_index(index, db_connection=connection) -> None:
+    """
+    Создает таблицу FTS5 с внешним содержимым и триггеры, которые
+    поддерживают ее в актуальном состоянии, в том числе при bulk_create.
+
+    SQLite удаляет триггеры вместе с таблицей, поэтому после миграций,
+    пересоздающих таблицу содержимого, триггеры устанавливаются заново
+    функцией `restore_search_indexes` по сигналу post_migrate.
+    """
+    columns = ', '.join(index.columns)
+    new = ', '.join(f'new.{column}' for column in index.columns)
+    old = ', '.join(f'old.{column}' for column in index.columns)
+    delete = (
+        f'INSERT INTO {index.table}({index.table}, rowid, {columns}) '
+        f"VALUES ('delete', old.id, {old});"
+    )
+    insert = (
+        f'INSERT INTO {index.table}(rowid, {columns}) '
+        f'VALUES (new.id, {new});'
+    )
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {index.table} '
+            f"USING fts5({columns}, content='{index.content_table}', "
+            f"content_rowid='id', {index.options})"
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {index.table}_insert '
+            f'AFTER INSERT ON {index.content_table} BEGIN {insert} END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {index.table}_delete '
+            f'AFTER DELETE ON {index.content_table} BEGIN {delete} END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {index.table}_update '
+            f'AFTER UPDATE OF {columns} ON {index.content_table} '
+            f'BEGIN {delete} {insert} END'
+        )
+        cursor.execute(
+            f'INSERT INTO {index.table}({index.table}, rank) '
+            f"VALUES ('rank', '{index.rank}')"
+        )
+
+
+def uninstall_search_index(index, db_connection=connection) -> None:
+    """
+    Удаляет триггеры индекса и его таблицу FTS5. Триггеры удаляются
+    первыми: иначе они ссылались бы на удаленную таблицу и ломали запись
+    в таблицу содержимого.
+    """
+    with db_connection.cursor() as cursor:
+        for action in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {index.table}_{action}')
+        cursor.execute(f'DROP TABLE IF EXISTS {index.table}')
+
+
+def restore_search_indexes(db_connection=connection) -> None:
+    """
+    Заново устанавливает триггеры уже созданных индексов FTS5. Содержимое
+    индекса при пересоздании таблицы не меняется, поэтому перестраивать
+    его не нужно, если миграция не изменяла данные таблицы в обход
+    триггеров; иначе индекс перестраивается командой rebuild_search.
+    """
+    if not is_search_supported(db_connection):
+        return
+    tables = set(db_connection.introspection.table_names())
+    for index in SEARCH_INDEXES:
+        if index.table in tables:
+            install_search_index(index, db_connection)
+
+
+def rebuild_search_index(index, db_connection=connection) -> None:
+    """Устанавливает индекс и заново строит его по таблице содержимого."""
+    install_search_index(index, db_connection)
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {index.table}({index.table}) VALUES ('rebuild')"
+        )
+
+
+def build_match_query(text: str):
+    """
+    Переводит пользовательскую строку в запрос FTS5: каждое слово ищется
+    как префикс, все слова должны присутствовать. Возвращает None, если в
+    строке нет слов.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_titles(queryset, text: str):
+    """
+    Оставляет произведения, в названии или описании которых есть слова
+    из `text`, и упорядочивает их по релевантности.
+    """
+    if not is_search_supported():
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    query = build_match_query(text)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(search__document__match=query).order_by(
+        'search__rank', *queryset.query.order_by
+    )
+
+
+def search_reviews(queryset, text: str):
+    """
+    Оставляет отзывы, в тексте которых есть слова из `text`, упорядочивает
+    их по релевантности и добавляет фрагмент текста `snippet`, в котором
+    совпадения обрамлены метками `SNIPPET_MARKERS`.
+    """
+    if not is_search_supported():
+        return queryset.filter(text__icontains=text).annotate(
+            snippet=F('text')
+        )
+    query = build_match_query(text)
+    if query is None:
+        return queryset.none()
+    return (
+        queryset.filter(search__document__match=query)
+        .annotate(
+            snippet=RawSQL(
+                f'snippet({REVIEW_SEARCH_INDEX.table}, 0, %s, %s, %s, %s)',
+                (*SNIPPET_MARKERS, SNIPPET_ELLIPSIS, SNIPPET_TOKENS),
+            )
+        )
+        .order_by('search__rank')
+    )
+
+
+def search_users(queryset, text: str, contains: bool = False):
+    """
+    Оставляет пользователей, имя которых без учета регистра начинается с
+    `text`, а при `contains` содержит `text`. Поиск по началу имени
+    выполняется диапазоном по индексу нормализованного имени, поиск по
+    подстроке - по триграммному индексу. Подстроки короче трех символов
+    триграммами не ищутся и проверяются перебором.
+    """
+    text = text.casefold()
+    if not contains:
+        return queryset.filter(
+            username_normalized__gte=text,
+            username_normalized__lt=f'{text}\U0010ffff',
+        )
+    if not is_search_supported() or len(text) < TRIGRAM_MIN_LENGTH:
+        return queryset.filter(username_normalized__contains=text)
+    phrase = text.replace('"', '""')
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {USER_SEARCH_INDEX.table} '
+            f'WHERE {USER_SEARCH_INDEX.table} MATCH %s',
+            (f'"{phrase}"',),
+        )
+    )
@@ -0,0 +1,108 @@
+from django.db import connections
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from reviews.models import Comment, GenreRating, Review, Title
+from reviews.search import restore_search_indexes
+from reviews.utils import (
+    create_genre_ratings,
+    get_deletion_batch,
+    update_comments_count,
+    update_title_scores,
+)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw, **kwargs):
+    """Запоминает произведение и оценку отзыва до его изменения."""
+    instance._previous_score = None
+    if instance.pk and not raw:
+        instance._previous_score = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list('title_id', 'score')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_scores_on_review_save(sender, instance, raw, **kwargs):
+    """Учитывает созданный или измененный отзыв в оценках произведения."""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_score', None)
+    if previous is None:
+        update_title_scores(instance.title_id, added=instance.score)
+        return
+    title_id, score = previous
+    if title_id == instance.title_id:
+        update_title_scores(title_id, added=instance.score, removed=score)
+        return
+    update_title_scores(title_id, removed=score)
+    update_title_scores(instance.title_id, added=instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_scores_on_review_delete(sender, instance, **kwargs):
+    """Исключает удаленный отзыв из оценок произведения."""
+    batch = get_deletion_batch()
+    if batch is not None:
+        batch.title_ids.add(instance.title_id)
+        return
+    update_title_scores(instance.title_id, removed=instance.score)
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, raw, **kwargs):
+    """Учитывает новый комментарий в счетчике комментариев отзыва."""
+    if created and not raw:
+        update_comments_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Исключает удаленный комментарий из счетчика комментариев отзыва."""
+    batch = get_deletion_batch()
+    if batch is not None:
+        batch.review_ids.add(instance.review_id)
+        return
+    update_comments_count(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+def update_genre_ratings_on_title_save(sender, instance, created, raw,
+                                       **kwargs):
+    """Переносит категорию измененного произведения в рейтинги жанров."""
+    if created or raw:
+        return
+    GenreRating.objects.filter(title_id=instance.pk).update(
+        category_id=instance.category_id
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_ratings_on_genre_change(sender, instance, action, reverse,
+                                         pk_set, **kwargs):
+    """Добавляет и удаляет рейтинги в жанрах вместе с жанрами произведения."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    owner, related = ('genre', 'title') if reverse else ('title', 'genre')
+    lookup = {f'{owner}_id': instance.pk}
+    if pk_set is not None:
+        lookup[f'{related}_id__in'] = pk_set
+    if action == 'post_add':
+        create_genre_ratings(sender.objects.filter(**lookup))
+    else:
+        GenreRating.objects.filter(**lookup).delete()
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    """
+    Восстанавливает триггеры поисковых индексов, которые SQLite удаляет
+    при пересоздании таблицы в миграциях.
+    """
+    restore_search_indexes(connections[using])
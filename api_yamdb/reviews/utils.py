@@ -0,0 +1,326 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, NullIf
+
+from reviews.const import MAX_SCORE, MIN_SCORE
+from reviews.models import (
+    Comment,
+    GenreRating,
+    Review,
+    Title,
+    User,
+    score_count_field,
+)
+
+
+_deletion = threading.local()
+
+# Коды ошибок строк пакетной загрузки отзывов.
+IMPORT_TITLE_NOT_FOUND = 'title_not_found'
+IMPORT_AUTHOR_NOT_FOUND = 'author_not_found'
+IMPORT_DUPLICATE_REVIEW = 'duplicate_review'
+
+
+def update_title_scores(
+    title_id: int, added: int = None, removed: int = None
+) -> None:
+    """
+    Атомарно учитывает добавленную и/или убранную оценку в сумме оценок,
+    количестве отзывов, рейтинге и гистограмме оценок произведения одним
+    UPDATE-запросом и переносит новый рейтинг в рейтинги жанров.
+    """
+    if added == removed:
+        return
+    score_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    score_sum = F('score_sum') + score_delta
+    reviews_count = F('reviews_count') + count_delta
+    changes = {
+        'score_sum': score_sum,
+        'reviews_count': reviews_count,
+        'rating': score_sum / NullIf(reviews_count, 0),
+    }
+    if added is not None:
+        field = score_count_field(added)
+        changes[field] = F(field) + 1
+    if removed is not None:
+        field = score_count_field(removed)
+        changes[field] = F(field) - 1
+    Title.objects.filter(pk=title_id).update(**changes)
+    GenreRating.objects.filter(title_id=title_id).update(
+        rating=Subquery(
+            Title.objects.filter(pk=OuterRef('title')).values('rating')
+        )
+    )
+
+
+def update_comments_count(review_id: int, delta: int) -> None:
+    """Атомарно сдвигает сохраненный счетчик комментариев отзыва."""
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def rebuild_title_ratings(titles=None) -> None:
+    """
+    Пересчитывает сохраненные рейтинги и гистограммы оценок произведений по
+    таблице отзывов.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = (
+        Review.objects.filter(title=OuterRef('pk')).order_by().values('title')
+    )
+
+    def aggregate(expression):
+        return Coalesce(
+            Subquery(reviews.annotate(total=expression).values('total')), 0
+        )
+
+    titles.update(
+        score_sum=aggregate(Sum('score')),
+        reviews_count=aggregate(Count('pk')),
+        **{
+            score_count_field(score): aggregate(
+                Count('pk', filter=Q(score=score))
+            )
+            for score in range(MIN_SCORE, MAX_SCORE + 1)
+        },
+    )
+    titles.update(rating=F('score_sum') / NullIf(F('reviews_count'), 0))
+    rebuild_genre_ratings(titles)
+
+
+def create_genre_ratings(links) -> None:
+    """Создает рейтинги в жанрах для связей произведений с жанрами."""
+    GenreRating.objects.bulk_create(
+        (
+            GenreRating(
+                genre_id=genre_id,
+                title_id=title_id,
+                category_id=category_id,
+                rating=rating,
+            )
+            for genre_id, title_id, category_id, rating in links.values_list(
+                'genre_id', 'title_id', 'title__category_id', 'title__rating'
+            )
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_genre_ratings(titles=None) -> None:
+    """Пересоздает рейтинги в жанрах по связям произведений с жанрами."""
+    links = Title.genre.through.objects.all()
+    ratings = GenreRating.objects.all()
+    if titles is not None:
+        links = links.filter(title__in=titles)
+        ratings = ratings.filter(title__in=titles)
+    with transaction.atomic():
+        ratings.delete()
+        create_genre_ratings(links)
+
+
+def rebuild_comment_counts(reviews=None) -> None:
+    """Пересчитывает сохраненные счетчики комментариев отзывов."""
+    if reviews is None:
+        reviews = Review.objects.all()
+    comments = (
+        Comment.objects.filter(review=OuterRef('pk'))
+        .order_by()
+        .values('review')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    reviews.update(comments_count=Coalesce(Subquery(comments), 0))
+
+
+class DeletionBatch:
+    """
+    Произведения и отзывы, потерявшие отзывы и комментарии при удалении
+    внутри `batch_deletes`. Их счетчики пересчитываются один раз после
+    удаления, а не на каждую удаленную строку.
+    """
+
+    def __init__(self):
+        self.title_ids = set()
+        self.review_ids = set()
+        self.changed_title_ids = set()
+
+    def apply(self) -> None:
+        """
+        Пересчитывает счетчики оставшихся произведений и отзывов и
+        запоминает в `changed_title_ids` произведения, отзывы которых
+        изменились.
+        """
+        # Удаленные вместе с каскадом строки не пересчитываются.
+        reviews = dict(
+            Review.objects.filter(pk__in=self.review_ids)
+            .order_by()
+            .values_list('pk', 'title_id')
+        ) if self.review_ids else {}
+        title_ids = set(
+            Title.objects.filter(pk__in=self.title_ids)
+            .order_by()
+            .values_list('pk', flat=True)
+        ) if self.title_ids else set()
+        if reviews:
+            rebuild_comment_counts(Review.objects.filter(pk__in=reviews))
+        if title_ids:
+            rebuild_title_ratings(Title.objects.filter(pk__in=title_ids))
+        self.changed_title_ids = title_ids | set(reviews.values())
+
+
+def get_deletion_batch():
+    """Возвращает пакет текущего блока `batch_deletes` или None."""
+    return getattr(_deletion, 'batch', None)
+
+
+@contextmanager
+def batch_deletes():
+    """
+    Откладывает пересчет счетчиков при удалении отзывов и комментариев
+    внутри блока до его конца. Каскадное удаление произведения или
+    пользователя тогда не обновляет по строке на каждый удаленный отзыв и
+    комментарий и не трогает удаляемые вместе с ними строки. Удаление и
+    пересчет выполняются в одной транзакции.
+    """
+    batch = DeletionBatch()
+    _deletion.batch = batch
+    try:
+        with transaction.atomic():
+            yield batch
+            _deletion.batch = None
+            batch.apply()
+    finally:
+        _deletion.batch = None
+
+
+def import_reviews(rows) -> list:
+    """
+    Создает отзывы из проверенных строк `title`, `author`, `text`, `score`
+    одним bulk_create и пересчитывает оценки затронутых произведений.
+
+    Существование произведений и авторов и правило одного отзыва на
+    произведение проверяются по заранее загруженным множествам id, без
+    запросов на каждую строку. Возвращает для каждой строки словарь с `id`
+    созданного отзыва или с кодом ошибки `error` из IMPORT_*.
+    """
+    title_ids = set(
+        Title.objects.filter(
+            id__in={row['title'] for row in rows}
+        ).values_list('id', flat=True)
+    )
+    author_ids = dict(
+        User.objects.filter(
+            username__in={row['author'] for row in rows}
+        ).values_list('username', 'id')
+    )
+    taken = set(
+        Review.objects.filter(
+            title_id__in=title_ids, author_id__in=author_ids.values()
+        ).values_list('title_id', 'author_id')
+    )
+    results = []
+    reviews = []
+    for row in rows:
+        key = (row['title'], author_ids.get(row['author']))
+        if key[0] not in title_ids:
+            error = IMPORT_TITLE_NOT_FOUND
+        elif key[1] is None:
+            error = IMPORT_AUTHOR_NOT_FOUND
+        elif key in taken:
+            error = IMPORT_DUPLICATE_REVIEW
+        else:
+            taken.add(key)
+            reviews.append(
+                Review(
+                    title_id=key[0],
+                    author_id=key[1],
+                    text=row['text'],
+                    score=row['score'],
+                )
+            )
+            results.append(key)
+            continue
+        results.append({'error': error})
+    if not reviews:
+        return results
+
+    created_titles = Title.objects.filter(
+        id__in={review.title_id for review in reviews}
+    )
+    with transaction.atomic():
+        Review.objects.bulk_create(reviews)
+        # SQLite не возвращает id из bulk_create, поэтому они читаются по
+        # уникальной паре произведения и автора.
+        review_ids = {
+            (title_id, author_id): review_id
+            for review_id, title_id, author_id in Review.objects.filter(
+                title__in=created_titles,
+                author_id__in={review.author_id for review in reviews},
+            ).values_list('id', 'title_id', 'author_id')
+        }
+        rebuild_title_ratings(created_titles)
+    return [
+        {'id': review_ids[result]} if isinstance(result, tuple) else result
+        for result in results
+    ]
+
+
+def get_top_title_ids(limit: int, genre: str = None, category: str = None):
+    """
+    Возвращает id произведений с наибольшим рейтингом в жанре и/или
+    категории. Выборка идет по индексу рейтинга и не зависит от размера
+    каталога.
+    """
+    if genre:
+        ranking = GenreRating.objects.filter(genre__slug=genre)
+        field = 'title_id'
+    else:
+        ranking = Title.objects.all()
+        field = 'id'
+    if category:
+        ranking = ranking.filter(category__slug=category)
+    return list(
+        ranking.filter(rating__isnull=False)
+        .order_by('-rating', f'-{field}')
+        .values_list(field, flat=True)[:limit]
+    )
+
+
+def find_rating_drift():
+    """
+    Возвращает произведения, у которых сохраненные суммы оценок, количество
+    отзывов или гистограмма оценок расходятся с фактическими.
+    """
+    actual = {
+        'actual_score_sum': Coalesce(Sum('reviews__score'), 0),
+        'actual_reviews_count': Count('reviews'),
+    }
+    stored = {
+        'score_sum': F('actual_score_sum'),
+        'reviews_count': F('actual_reviews_count'),
+    }
+    for score in range(MIN_SCORE, MAX_SCORE + 1):
+        field = score_count_field(score)
+        actual[f'actual_{field}'] = Count(
+            'reviews', filter=Q(reviews__score=score)
+        )
+        stored[field] = F(f'actual_{field}')
+    return Title.objects.order_by('pk').annotate(**actual).exclude(**stored)
+
+
+def find_comment_count_drift():
+    """
+    Возвращает отзывы, у которых сохраненное количество комментариев
+    расходится с фактическим.
+    """
+    return (
+        Review.objects.order_by('pk')
+        .annotate(actual_comments_count=Count('comments'))
+        .exclude(comments_count=F('actual_comments_count'))
+    )
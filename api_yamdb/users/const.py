@@ -1,2 +1,4 @@
 MAX_BIO_LENGHT: int = 512
 MAX_ROLE_LENGTH: int = 50
+# casefold может удлинить строку: 'ß' превращается в 'ss'.
+MAX_USERNAME_NORMALIZED_LENGTH: int = 450
@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-17 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_alter_customuser_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(
+                fields=['date_joined', 'role'],
+                name='user_date_joined_role_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 3.2 on 2026-10-17 06:10
+
+from django.db import migrations, models
+from reviews.search import (
+    USER_SEARCH_INDEX,
+    is_search_supported,
+    rebuild_search_index,
+    uninstall_search_index,
+)
+
+BATCH_SIZE = 1000
+
+
+def fill_username_normalized(apps, schema_editor):
+    User = apps.get_model('users', 'CustomUser')
+    users = list(User.objects.only('id', 'username'))
+    for user in users:
+        user.username_normalized = user.username.casefold()
+    User.objects.bulk_update(
+        users, ('username_normalized',), batch_size=BATCH_SIZE
+    )
+
+
+def create_user_search(apps, schema_editor):
+    if is_search_supported(schema_editor.connection):
+        rebuild_search_index(USER_SEARCH_INDEX, schema_editor.connection)
+
+
+def drop_user_search(apps, schema_editor):
+    if is_search_supported(schema_editor.connection):
+        uninstall_search_index(USER_SEARCH_INDEX, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_date_joined_role_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='username_normalized',
+            field=models.CharField(
+                default='',
+                editable=False,
+                max_length=450,
+                verbose_name='имя пользователя без учета регистра',
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            fill_username_normalized, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(
+                fields=['username_normalized', 'id'],
+                name='user_username_normalized_idx',
+            ),
+        ),
+        migrations.RunPython(create_user_search, drop_user_search),
+    ]
@@ -1,7 +1,11 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
-from users.const import MAX_BIO_LENGHT, MAX_ROLE_LENGTH
+from users.const import (
+    MAX_BIO_LENGHT,
+    MAX_ROLE_LENGTH,
+    MAX_USERNAME_NORMALIZED_LENGTH,
+)
 
 
 class CustomUser(AbstractUser):
@@ -22,11 +26,35 @@ class CustomUser(AbstractUser):
     bio = models.TextField(
         max_length=MAX_BIO_LENGHT, blank=True, verbose_name='биография'
     )
+    username_normalized = models.CharField(
+        max_length=MAX_USERNAME_NORMALIZED_LENGTH,
+        editable=False,
+        verbose_name='имя пользователя без учета регистра',
+    )
 
     class Meta:
         verbose_name = 'пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('date_joined', 'role')
+        indexes = [
+            models.Index(
+                fields=('date_joined', 'role'),
+                name='user_date_joined_role_idx',
+            ),
+            models.Index(
+                fields=('username_normalized', 'id'),
+                name='user_username_normalized_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.username_normalized = self.username.casefold()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'username' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, 'username_normalized'
+            }
+        super().save(*args, **kwargs)
 
     @property
     def is_admin(self):
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08StoredRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    DISTRIBUTION_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/rating-distribution/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения обновляется при создании '
+            'отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 10},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения обновляется при изменении '
+            'оценки отзыва.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 10, (
+            'Проверьте, что рейтинг произведения обновляется при удалении '
+            'отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что рейтинг произведения сбрасывается, когда у '
+            'произведения не остается отзывов.'
+        )
+
+    def test_02_rebuild_ratings_command(self, client, admin_client, admin,
+                                        user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        call_command('rebuild_ratings', '--check')
+
+        Title.objects.filter(pk=title_id).update(
+            score_sum=0, reviews_count=0, rating=None
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        # Кешируем ответ с испорченным рейтингом.
+        assert self.get_rating(client, title_id) is None
+
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'рейтинг произведения и сбрасывает кеш произведений.'
+        )
+
+    def test_03_rating_distribution(self, client, admin_client, admin, user,
+                                    user_client, moderator,
+                                    moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9},
+        )
+        url = self.DISTRIBUTION_URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.DISTRIBUTION_URL_TEMPLATE}` не найден или '
+            'возвращает ответ со статусом, отличным от 200.'
+        )
+        data = response.json()
+        counts = {item['score']: item['count'] for item in data['distribution']}
+        assert counts == {
+            score: {5: 2, 9: 1}.get(score, 0) for score in range(1, 11)
+        }, (
+            f'Проверьте, что `{self.DISTRIBUTION_URL_TEMPLATE}` возвращает '
+            'количество отзывов с каждой оценкой.'
+        )
+        assert data['reviews_count'] == 3 and data['rating'] == 6
+
+        Title.objects.filter(pk=title_id).update(score_9_count=0)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+
+        response = client.get(
+            self.DISTRIBUTION_URL_TEMPLATE.format(title_id=0)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
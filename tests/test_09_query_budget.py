@@ -0,0 +1,291 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from api import const
+from reviews.models import Genre
+from tests.utils import (
+    check_query_budget, create_genre, create_reviews, create_single_review,
+    create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    # COUNT, страница произведений с категориями, жанры страницы.
+    TITLES_LIST_QUERIES = 3
+
+    def create_many_titles(self, admin_client, count):
+        genres = create_genre(admin_client)
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}
+        )
+        for idx in range(count):
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': f'Произведение {idx}',
+                'year': 2000,
+                'genre': [genre['slug'] for genre in genres],
+                'category': 'films',
+            })
+            assert response.status_code == HTTPStatus.CREATED
+
+    @pytest.mark.parametrize('titles_count', (1, 10))
+    def test_01_titles_list(self, client, admin_client, titles_count):
+        self.create_many_titles(admin_client, titles_count)
+        response = check_query_budget(
+            client, self.TITLES_URL, self.TITLES_LIST_QUERIES
+        )
+        assert len(response.json()['results']) == titles_count
+
+    def test_02_titles_detail(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        check_query_budget(
+            client,
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            2,
+        )
+
+    def test_03_titles_write_response(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        data = {
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug'],
+        }
+        # Слаги жанров разрешаются одним запросом, два запроса добавляют
+        # рейтинги произведения в жанрах.
+        response = check_query_budget(
+            admin_client, self.TITLES_URL, 11, method='post', data=data
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = check_query_budget(
+            admin_client,
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            13,
+            method='patch',
+            data={'genre': [genre['slug'] for genre in genres]},
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_titles_detail_reviews_preview(self, client, admin_client,
+                                              admin, user, user_client,
+                                              moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = check_query_budget(client, f'{url}?reviews_preview=2', 3)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert len(data['reviews_preview']) == 2, (
+            'Проверьте, что параметр `reviews_preview` ограничивает '
+            'количество встроенных отзывов.'
+        )
+        assert data['reviews_preview'][0]['author'] == moderator.username, (
+            'Проверьте, что в `reviews_preview` выводятся последние отзывы.'
+        )
+        assert 'reviews_preview' not in client.get(url).json(), (
+            'Проверьте, что без параметра `reviews_preview` отзывы в ответ '
+            'не встраиваются.'
+        )
+
+        response = client.get(f'{url}?reviews_preview=0')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_titles_count_cache(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}?category={categories[0]["slug"]}'
+        assert client.get(url).json()['count'] == 1
+        response = check_query_budget(
+            client, f'{url}&year=', self.TITLES_LIST_QUERIES - 1
+        )
+        assert response.json()['count'] == 1, (
+            'Проверьте, что количество произведений для одинаковых фильтров '
+            'берется из кеша.'
+        )
+
+        admin_client.patch(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            data={'category': categories[0]['slug']},
+        )
+        assert client.get(url).json()['count'] == 2, (
+            'Проверьте, что кеш количества произведений сбрасывается при '
+            'изменении произведений.'
+        )
+
+    def test_06_titles_estimated_count(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(f'{self.TITLES_URL}?count=estimated')
+        data = response.json()
+        assert data['count'] == 2
+        assert data['count_estimated'] is False
+
+    def test_07_titles_sparse_fields(self, client, admin_client):
+        create_titles(admin_client)
+        url = f'{self.TITLES_URL}?fields=id,name,rating'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        fields = set(response.json()['results'][0])
+        assert fields == {'id', 'name', 'rating'}, (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        assert len(context) == self.TITLES_LIST_QUERIES - 1, (
+            'Проверьте, что без поля `genre` жанры не запрашиваются.'
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert 'reviews_category' not in sql and 'description' not in sql, (
+            'Проверьте, что колонки и связи невыбранных полей не '
+            'запрашиваются из базы данных.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}?omit=description,genre')
+        assert set(response.json()['results'][0]) == {
+            'id', 'rating', 'reviews_count', 'category', 'name', 'year'
+        }, (
+            'Проверьте, что параметр `omit` убирает перечисленные поля из '
+            'ответа.'
+        )
+        response = client.get(f'{self.TITLES_URL}?fields=id,unknown')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_08_titles_unknown_genre_error(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        slugs = [genres[0]['slug'], 'unknown', genres[1]['slug']]
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': slugs,
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        field = serializers.SlugRelatedField(
+            slug_field='slug', many=True, queryset=Genre.objects.all()
+        )
+        with pytest.raises(serializers.ValidationError) as error:
+            field.run_validation(slugs)
+        assert response.json()['genre'] == error.value.detail, (
+            'Проверьте, что ошибка для несуществующего жанра не изменилась.'
+        )
+        for slugs in ([genres[0]['slug'], None], [genres[0]['slug'], '']):
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': 'Чужой',
+                'year': 1979,
+                'genre': slugs,
+                'category': categories[0]['slug'],
+            }, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            with pytest.raises(serializers.ValidationError) as error:
+                field.run_validation(slugs)
+            assert response.json()['genre'] == error.value.detail, (
+                'Проверьте, что ошибка для пустого жанра не изменилась.'
+            )
+
+    def test_09_review_create(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_DETAIL_URL_TEMPLATE}reviews/'.format(
+            title_id=titles[0]['id']
+        )
+        data = {'text': 'Отзыв', 'score': 7}
+        # Пользователь, произведение, транзакция с вставкой отзыва и
+        # обновлением рейтингов произведения и жанров.
+        response = check_query_budget(
+            user_client, url, 7, method='post', data=data
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': [
+                'Нельзя добавить больше 1 отзыва на произведение.'
+            ]
+        }, (
+            'Проверьте, что ошибка повторного отзыва не изменилась.'
+        )
+        response = user_client.post(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=0) + 'reviews/',
+            data=data,
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_10_comments_parent_lookup(self, client, admin_client,
+                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 7
+        ).json()
+        url = (
+            f'{self.TITLES_DETAIL_URL_TEMPLATE}reviews/{{review_id}}/'
+            'comments/'
+        )
+        comments_url = url.format(
+            title_id=titles[0]['id'], review_id=review['id']
+        )
+        # Пользователь, отзыв, транзакция со вставкой комментария и
+        # обновлением счетчика комментариев отзыва.
+        response = check_query_budget(
+            user_client, comments_url, 5, method='post', data={'text': 'Да'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(comments_url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(context) == 3, (
+            'Проверьте, что список комментариев получает отзыв, число '
+            'комментариев и страницу за три запроса.'
+        )
+        sql = context.captured_queries[0]['sql']
+        assert '"reviews_review"."text"' not in sql and 'JOIN' not in sql, (
+            'Проверьте, что для списка комментариев не загружается отзыв '
+            'целиком.'
+        )
+
+        wrong_url = url.format(
+            title_id=titles[1]['id'], review_id=review['id']
+        )
+        assert client.get(wrong_url).status_code == HTTPStatus.NOT_FOUND
+        response = user_client.post(wrong_url, data={'text': 'Да'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий нельзя добавить к отзыву другого '
+            'произведения.'
+        )
+
+    def test_11_titles_estimated_count_pages(self, client, admin_client,
+                                             monkeypatch):
+        monkeypatch.setattr(const, 'ESTIMATED_COUNT_LIMIT', 5)
+        self.create_many_titles(admin_client, 25)
+        names, url, params = [], self.TITLES_URL, {'count': 'estimated'}
+        while url:
+            response = client.get(url, params)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что при `count=estimated` доступны страницы за '
+                'пределом оценки количества.'
+            )
+            data = response.json()
+            assert data['count_estimated'] is True
+            assert data['count'] >= len(names) + len(data['results'])
+            names.extend(title['name'] for title in data['results'])
+            url, params = data['next'], None
+        assert sorted(names) == sorted(
+            f'Произведение {idx}' for idx in range(25)
+        ), (
+            'Проверьте, что при `count=estimated` ссылки `next` проходят '
+            'все произведения.'
+        )
+        response = client.get(
+            self.TITLES_URL, {'count': 'estimated', 'page': 4}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+from tests.utils import check_query_budget
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/?pagination=cursor'
+    REVIEWS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/?pagination=cursor'
+    )
+
+    def walk(self, client, url):
+        pages = []
+        while url:
+            response = check_query_budget(client, url, 2)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не выполняется подсчет '
+                'общего количества объектов.'
+            )
+            pages.append(data)
+            url = data['next']
+        return pages
+
+    def test_01_titles_cursor(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx % 5}', year=2000)
+            for idx in range(23)
+        )
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+
+        pages = self.walk(client, self.TITLES_URL)
+        assert [len(page['results']) for page in pages] == [10, 10, 3]
+        assert pages[0]['previous'] is None
+        received = [
+            title['id'] for page in pages for title in page['results']
+        ]
+        assert received == expected, (
+            'Проверьте, что курсорная пагинация произведений возвращает все '
+            'произведения по порядку `name`, `id` без пропусков и повторов.'
+        )
+
+        response = client.get(pages[-1]['previous'])
+        assert response.json()['results'] == pages[1]['results'], (
+            'Проверьте, что ссылка `previous` в режиме курсора возвращает '
+            'предыдущую страницу.'
+        )
+
+    def test_02_reviews_cursor(self, client, django_user_model):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for idx in range(12):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='text', score=5
+            )
+        expected = list(
+            title.reviews.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+
+        pages = self.walk(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        )
+        received = [
+            review['id'] for page in pages for review in page['results']
+        ]
+        assert received == expected, (
+            'Проверьте, что курсорная пагинация отзывов возвращает отзывы '
+            'от новых к старым без пропусков и повторов.'
+        )
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}&cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_cursor_with_ordering(self, client):
+        Title.objects.create(name='Произведение', year=2000)
+        for params in ('&ordering=year', '&search=Произведение'):
+            response = client.get(f'{self.TITLES_URL}{params}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что режим курсора нельзя совмещать с другой '
+                'сортировкой произведений.'
+            )
+        response = client.get(f'{self.TITLES_URL}&ordering=name')
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.views import CategoryViewSet
+from tests.utils import (
+    check_query_budget, create_categories, create_single_comment,
+    create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    CACHE_STATS_URL = '/api/v1/cache-stats/'
+
+    def test_01_cached_list(self, client, admin_client):
+        create_categories(admin_client)
+        response = client.get(self.CATEGORIES_URL)
+        assert response['X-Cache'] == 'MISS'
+        response = check_query_budget(client, self.CATEGORIES_URL, 0)
+        assert response['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORIES_URL}` '
+            'отдается из кеша.'
+        )
+        assert response.json()['count'] == 2
+
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORIES_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 3, (
+            'Проверьте, что кеш категорий сбрасывается при добавлении '
+            'категории.'
+        )
+
+    def test_02_review_invalidates_title(self, client, admin_client,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+        create_single_review(user_client, titles[0]['id'], 'text', 8)
+        assert client.get(url).json()['rating'] == 8, (
+            'Проверьте, что кеш произведений сбрасывается при добавлении '
+            'отзыва.'
+        )
+
+    def test_03_stale_while_revalidate(self, client, admin_client):
+        create_categories(admin_client)
+        client.get(self.CATEGORIES_URL)
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        request = Request(APIRequestFactory().get(self.CATEGORIES_URL))
+        key = CategoryViewSet().get_response_cache_key(request)
+        assert cache.add(f'{key}:lock', 1)
+        response = check_query_budget(client, self.CATEGORIES_URL, 0)
+        assert response['X-Cache'] == 'STALE', (
+            'Проверьте, что пока устаревший ответ пересобирается другим '
+            'запросом, клиенты получают устаревший ответ без ожидания.'
+        )
+        assert response.json()['count'] == 2
+
+        cache.delete(f'{key}:lock')
+        response = client.get(self.CATEGORIES_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 3
+
+    def test_04_cache_stats(self, client, user_client, admin_client):
+        client.get(self.CATEGORIES_URL)
+        client.get(self.CATEGORIES_URL)
+        assert user_client.get(self.CACHE_STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.get(self.CACHE_STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['hit'] == 1 and data['miss'] == 1, (
+            f'Проверьте, что `{self.CACHE_STATS_URL}` возвращает счетчики '
+            'попаданий и промахов кеша.'
+        )
+        assert data['hit_ratio'] == 0.5
+
+    def test_05_comment_invalidates_title_preview(self, client, admin_client,
+                                                  user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 8
+        ).json()
+        detail_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        url = f'{detail_url}?reviews_preview=5'
+        client.get(url)
+        etag = client.get(url)['ETag']
+        client.get(self.TITLES_URL)
+        detail_etag = client.get(detail_url)['ETag']
+
+        create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'comment'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['reviews_preview'][0]['comments_count'] == 1, (
+            'Проверьте, что кеш произведений сбрасывается при добавлении '
+            'комментария.'
+        )
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'HIT'
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что комментарии не сбрасывают кеш произведений без '
+            'последних отзывов.'
+        )
+
+        admin_client.patch(detail_url, data={'name': 'Новое название'})
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['name'] == 'Новое название', (
+            'Проверьте, что изменение произведения сбрасывает кеш ответов с '
+            'последними отзывами.'
+        )
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    check_query_budget, create_categories, create_single_review,
+    create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_etag(self, client, admin_client):
+        create_categories(admin_client)
+        response = client.get(self.CATEGORIES_URL)
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{self.CATEGORIES_URL}` '
+            'содержит заголовок `ETag`.'
+        )
+        assert response.get('Last-Modified')
+
+        response = check_query_budget(
+            client, self.CATEGORIES_URL, 0, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` с текущим `ETag` '
+            'возвращается ответ со статусом 304.'
+        )
+
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения категорий `ETag` меняется.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_reviews_etag(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        other_url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        etag = client.get(url)['ETag']
+        other_etag = client.get(other_url)['ETag']
+
+        create_single_review(user_client, titles[0]['id'], 'text', 8)
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что версия списка отзывов не меняется при добавлении '
+            'отзыва к другому произведению.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+
+    def test_03_if_modified_since(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-Modified-Since` с '
+            '`Last-Modified` возвращается ответ со статусом 304.'
+        )
+
+    def test_04_reviews_etag_author_rename(self, client, admin_client,
+                                           user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 8)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+
+        user_client.patch('/api/v1/users/me/', data={'username': 'Renamed'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение имени автора меняет версию списка '
+            'отзывов.'
+        )
+        assert response.json()['results'][0]['author'] == 'Renamed'
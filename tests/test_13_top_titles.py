@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import GenreRating
+from reviews.utils import rebuild_genre_ratings
+from tests.utils import check_query_budget, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TopTitles:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    TOP_URL = '/api/v1/titles/top/'
+
+    def get_top(self, client, query=''):
+        response = check_query_budget(client, f'{self.TOP_URL}{query}', 3)
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()]
+
+    def create_rated_titles(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Сияние',
+            'year': 1977,
+            'genre': ['horror'],
+            'category': 'books',
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        titles.append(response.json())
+        for title, score in zip(titles, (6, 4, 9)):
+            create_single_review(user_client, title['id'], 'text', score)
+        return [title['id'] for title in titles]
+
+    def test_01_top_titles(self, client, admin_client, user_client):
+        first, second, third = self.create_rated_titles(
+            admin_client, user_client
+        )
+        assert self.get_top(client) == [third, first, second], (
+            f'Проверьте, что `{self.TOP_URL}` возвращает произведения по '
+            'убыванию рейтинга.'
+        )
+        assert self.get_top(client, '?genre=horror') == [third, first], (
+            'Проверьте, что параметр `genre` ограничивает лучшие '
+            'произведения жанром.'
+        )
+        assert self.get_top(client, '?category=books') == [third, second]
+        assert self.get_top(
+            client, '?genre=horror&category=films'
+        ) == [first]
+        assert self.get_top(client, '?limit=1') == [third]
+        response = client.get(f'{self.TOP_URL}?limit=0')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_top_titles_follow_changes(self, client, admin_client,
+                                          user_client):
+        first, _, third = self.create_rated_titles(admin_client, user_client)
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=third),
+            data={'genre': ['comedy']},
+        )
+        assert self.get_top(client, '?genre=horror') == [first], (
+            'Проверьте, что лучшие произведения жанра обновляются при '
+            'изменении жанров произведения.'
+        )
+        assert self.get_top(client, '?genre=comedy') == [third, first]
+
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=first),
+            data={'category': 'books'},
+        )
+        assert self.get_top(
+            client, '?genre=comedy&category=books'
+        ) == [third, first], (
+            'Проверьте, что лучшие произведения жанра обновляются при '
+            'изменении категории произведения.'
+        )
+
+        expected = set(GenreRating.objects.values_list(
+            'genre_id', 'title_id', 'category_id', 'rating'
+        ))
+        rebuild_genre_ratings()
+        assert set(GenreRating.objects.values_list(
+            'genre_id', 'title_id', 'category_id', 'rating'
+        )) == expected, (
+            'Проверьте, что рейтинги в жанрах, обновляемые по событиям, '
+            'совпадают с пересчитанными заново.'
+        )
@@ -0,0 +1,49 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleValuesSerializer:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def get_content(self, client, settings, url, fast):
+        settings.FAST_TITLE_SERIALIZER = fast
+        cache.clear()
+        response = client.get(url)
+        return response.status_code, response.content
+
+    def test_01_identical_output(self, client, admin_client, user_client,
+                                 settings):
+        titles, categories, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        admin_client.delete(f'/api/v1/categories/{categories[1]["slug"]}/')
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        urls = (
+            self.TITLES_URL,
+            f'{self.TITLES_URL}?pagination=cursor',
+            f'{self.TITLES_URL}?fields=id,name,genre',
+            f'{self.TITLES_URL}?omit=category',
+            f'{self.TITLES_URL}top/',
+            detail_url,
+            f'{detail_url}?fields=category,year',
+        )
+        for url in urls:
+            assert self.get_content(client, settings, url, True) == (
+                self.get_content(client, settings, url, False)
+            ), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` совпадает '
+                'побайтно для быстрого и стандартного сериализаторов.'
+            )
+
+    def test_02_benchmark_command(self, admin_client, capsys):
+        create_titles(admin_client)
+        call_command('benchmark_titles', '--sizes', '1', '2', '--repeat', '1')
+        output = capsys.readouterr().out
+        assert '1 titles' in output and '2 titles' in output
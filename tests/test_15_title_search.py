@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Title
+from reviews.search import (
+    TITLE_SEARCH_INDEX, rebuild_search_index, uninstall_search_index
+)
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.search(client, 'терм') == ['Терминатор'], (
+            'Проверьте, что параметр `search` ищет произведения по началу '
+            'слова в названии.'
+        )
+        assert self.search(client, 'KI YAY') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `search` ищет по описанию без учета '
+            'регистра.'
+        )
+        assert self.search(client, 'терминатор орешек') == []
+        assert self.search(client, '"*') == []
+
+    def test_02_search_ranking(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            data={'description': 'Не Терминатор'},
+        )
+        assert self.search(client, 'терминатор') == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'name': 'Чужой'},
+        )
+        admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        )
+        assert self.search(client, 'терминатор') == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении и '
+            'удалении произведений.'
+        )
+        assert self.search(client, 'чуж') == ['Чужой']
+
+    def test_03_bulk_create_and_rebuild(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Солярис {idx}', year=1972) for idx in range(3)
+        )
+        assert len(self.search(client, 'солярис')) == 3, (
+            'Проверьте, что произведения, созданные через `bulk_create`, '
+            'попадают в поисковый индекс.'
+        )
+        call_command('rebuild_search')
+        assert len(self.search(client, 'солярис')) == 3
+
+    def test_04_uninstall_index(self, client):
+        uninstall_search_index(TITLE_SEARCH_INDEX)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE name LIKE %s",
+                    (f'{TITLE_SEARCH_INDEX.table}%',),
+                )
+                assert cursor.fetchall() == [], (
+                    'Проверьте, что при удалении поискового индекса '
+                    'удаляются и его триггеры.'
+                )
+            Title.objects.create(name='Солярис', year=1972)
+        finally:
+            rebuild_search_index(TITLE_SEARCH_INDEX)
+        assert self.search(client, 'солярис') == ['Солярис']
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review
+from reviews.search import (
+    REVIEW_SEARCH_INDEX, rebuild_search_index, uninstall_search_index
+)
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ReviewSearch:
+
+    SEARCH_URL = '/api/v1/reviews/search/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_permissions(self, client, user_client, moderator_client):
+        url = f'{self.SEARCH_URL}?search=текст'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.SEARCH_URL}` недоступен пользователю '
+            'с ролью `user`.'
+        )
+        assert moderator_client.get(url).status_code == HTTPStatus.OK
+        response = moderator_client.get(self.SEARCH_URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что без параметра `search` возвращается ответ со '
+            'статусом 400.'
+        )
+
+    def test_02_search(self, admin_client, user, user_client,
+                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отличный фильм про роботов', 9
+        ).json()
+        create_single_review(
+            user_client, titles[1]['id'], 'Смешной боевик', 7
+        )
+        create_single_review(
+            moderator_client, titles[0]['id'], 'Скучно', 3
+        )
+
+        response = moderator_client.get(self.SEARCH_URL, {'search': 'робот'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 1, (
+            'Проверьте, что поиск отзывов находит отзывы по началу слова '
+            'во всех произведениях.'
+        )
+        found = data['results'][0]
+        assert found['id'] == review['id']
+        assert found['title'] == titles[0]['id']
+        assert found['author'] == user.username
+        assert '<mark>роботов</mark>' in found['snippet'], (
+            'Проверьте, что в поле `snippet` совпадения выделены тегом '
+            '`<mark>`.'
+        )
+
+        admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=review['id']
+            ),
+            data={'text': 'Отличный фильм'},
+        )
+        response = admin_client.get(self.SEARCH_URL, {'search': 'робот'})
+        assert response.json()['count'] == 0, (
+            'Проверьте, что поисковый индекс отзывов обновляется при '
+            'изменении текста отзыва.'
+        )
+
+    def test_03_snippet_escaped(self, admin_client, user_client,
+                                moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(
+            user_client, titles[0]['id'],
+            '<script>alert(1)</script> hello world', 5,
+        )
+        response = moderator_client.get(self.SEARCH_URL, {'search': 'hello'})
+        snippet = response.json()['results'][0]['snippet']
+        assert snippet == (
+            '&lt;script&gt;alert(1)&lt;/script&gt; <mark>hello</mark> world'
+        ), (
+            'Проверьте, что текст отзыва в поле `snippet` экранируется, и '
+            'тегом остается только выделение совпадений.'
+        )
+
+    def test_04_uninstall_index(self, admin_client, user,
+                                moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        uninstall_search_index(REVIEW_SEARCH_INDEX)
+        try:
+            Review.objects.create(
+                title_id=titles[0]['id'], author=user, text='Солярис',
+                score=5,
+            )
+        finally:
+            rebuild_search_index(REVIEW_SEARCH_INDEX)
+        response = moderator_client.get(
+            self.SEARCH_URL, {'search': 'солярис'}
+        )
+        assert response.json()['count'] == 1, (
+            'Проверьте, что при удалении поискового индекса отзывов '
+            'удаляются и его триггеры.'
+        )
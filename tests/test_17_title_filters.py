@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.filters import TitleFilterSet
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        names = [title['name'] for title in data['results']]
+        assert data['count'] == len(names), (
+            'Проверьте, что фильтры по жанрам не размножают произведения в '
+            'счетчике `count`.'
+        )
+        return sorted(names)
+
+    def test_01_multiple_slugs(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.get_names(client, {'genre': 'horror,comedy'}) == [
+            'Терминатор'
+        ], (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'выводится один раз.'
+        )
+        assert self.get_names(client, {'genre': 'horror,drama'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что по умолчанию фильтр `genre` выбирает '
+            'произведения с любым из перечисленных жанров.'
+        )
+        assert self.get_names(
+            client, {'genre': 'horror,comedy', 'genre_match': 'all'}
+        ) == ['Терминатор']
+        assert self.get_names(
+            client, {'genre': 'horror,drama', 'genre_match': 'all'}
+        ) == [], (
+            'Проверьте, что при `genre_match=all` выбираются только '
+            'произведения со всеми перечисленными жанрами.'
+        )
+        assert self.get_names(client, {'category': 'films,books'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        response = client.get(self.TITLES_URL, {'genre_match': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.parametrize('params', (
+        {'genre': 'horror,comedy'},
+        {'genre': 'horror,comedy', 'genre_match': 'all'},
+        {'category': 'films,books'},
+    ))
+    def test_02_semi_join_plan(self, params):
+        queryset = TitleFilterSet(
+            params, queryset=Title.objects.order_by('name')
+        ).qs
+        sql = str(queryset.query)
+        assert 'DISTINCT' not in sql, (
+            'Проверьте, что фильтры по жанрам и категориям не используют '
+            '`DISTINCT`.'
+        )
+        assert 'FROM "reviews_title" WHERE' in sql, (
+            'Проверьте, что жанры и категории не соединяются с основным '
+            'запросом.'
+        )
+        plan = queryset.explain()
+        assert 'SCAN U' not in plan, (
+            'Проверьте, что подзапросы фильтров выполняются поиском по '
+            f'индексу:\n{plan}'
+        )
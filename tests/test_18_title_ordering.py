@@ -0,0 +1,87 @@
+from http import HTTPStatus
+from itertools import product
+
+import pytest
+
+from api.filters import TitleFilterSet
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+FILTERS = (
+    {},
+    {'category': 'films'},
+    {'genre': 'horror,comedy'},
+    {'genre': 'horror,comedy', 'genre_match': 'all'},
+    {'category': 'films,books'},
+    {'year_min': 1980, 'year_max': 1990},
+    {'name': 'Терминатор'},
+    {'category': 'films', 'year_min': 1980},
+)
+ORDERINGS = (
+    ('name', 'id'),
+    ('year', 'id'),
+    ('-year', '-id'),
+    ('rating', 'id'),
+    ('-rating', '-id'),
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_year_range_and_ordering(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'text', 8)
+        create_single_review(user_client, titles[0]['id'], 'text', 4)
+        assert self.get_names(client, {'year_min': 1985}) == [
+            'Крепкий орешек'
+        ], (
+            'Проверьте, что фильтр `year_min` оставляет произведения с годом '
+            'не меньше указанного.'
+        )
+        assert self.get_names(client, {'year_max': 1985}) == ['Терминатор']
+        assert self.get_names(
+            client, {'year_min': 1990, 'year_max': 2000}
+        ) == []
+
+        assert self.get_names(client, {'ordering': '-year'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте, что произведения можно сортировать по году.'
+        assert self.get_names(client, {'ordering': 'rating'}) == [
+            'Терминатор', 'Крепкий орешек'
+        ], 'Проверьте, что произведения можно сортировать по рейтингу.'
+        assert self.get_names(client, {'ordering': 'description'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что сортировка по полям вне списка разрешенных '
+            'игнорируется.'
+        )
+
+    @pytest.mark.parametrize(
+        'params,ordering', tuple(product(FILTERS, ORDERINGS))
+    )
+    def test_02_no_full_table_sort(self, params, ordering):
+        queryset = TitleFilterSet(params, queryset=Title.objects.all()).qs
+        plan = queryset.order_by(*ordering).explain()
+        sorted_in_memory = 'TEMP B-TREE' in plan
+        assert not (
+            sorted_in_memory and 'SCAN reviews_title\n' in f'{plan}\n'
+        ), (
+            'Проверьте, что фильтры и сортировка произведений не приводят к '
+            f'сортировке всей таблицы:\n{plan}'
+        )
+        if set(params) <= {'category', 'genre', 'genre_match'} and (
+            ',' not in params.get('category', '')
+        ):
+            assert not sorted_in_memory, (
+                'Проверьте, что сортировка по одной категории или жанрам '
+                f'берется из индекса:\n{plan}'
+            )
@@ -0,0 +1,175 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from tests.utils import capture_query_plans
+
+TITLES_COUNT = 2000
+USERS_COUNT = 200
+REVIEWS_PER_TITLE = 2
+
+user_model = get_user_model()
+
+# Полный проход по таблице без индекса.
+FULL_SCAN = re.compile(r'^SCAN \S+$')
+# Сортировка допустима только для строк текущей страницы, которые
+# выбираются по списку id.
+PAGE_LOOKUP = re.compile(r' IN \(%s')
+
+
+@pytest.fixture(scope='module')
+def synthetic_data(django_db_setup, django_db_blocker):
+    # SQLite не возвращает id из bulk_create, поэтому созданные объекты
+    # перечитываются из базы.
+    with django_db_blocker.unblock():
+        user_model.objects.bulk_create(
+            user_model(
+                username=f'user{idx}',
+                username_normalized=f'user{idx}',
+                email=f'user{idx}@yamdb.fake',
+                role=('user', 'moderator', 'admin')[idx % 3],
+            )
+            for idx in range(USERS_COUNT)
+        )
+        users = list(user_model.objects.order_by('id'))
+        Category.objects.bulk_create(
+            Category(name=f'Категория {idx}', slug=f'category-{idx}')
+            for idx in range(10)
+        )
+        categories = list(Category.objects.order_by('id'))
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(20)
+        )
+        genres = list(Genre.objects.order_by('id'))
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {idx}',
+                year=1900 + idx % 120,
+                category=categories[idx % len(categories)],
+                description=f'Описание {idx}',
+            )
+            for idx in range(TITLES_COUNT)
+        )
+        titles = list(Title.objects.order_by('id'))
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(
+                title_id=title.id,
+                genre_id=genres[(idx + shift) % len(genres)].id,
+            )
+            for idx, title in enumerate(titles)
+            for shift in (0, 7)
+        )
+        Review.objects.bulk_create(
+            Review(
+                title=title,
+                author=users[(idx + shift) % USERS_COUNT],
+                text=f'Отзыв {idx}',
+                score=1 + (idx + shift) % 10,
+            )
+            for idx, title in enumerate(titles)
+            for shift in range(REVIEWS_PER_TITLE)
+        )
+        reviews = list(Review.objects.order_by('id'))
+        Comment.objects.bulk_create(
+            Comment(
+                review=review,
+                author=users[idx % USERS_COUNT],
+                text=f'Комментарий {idx}',
+            )
+            for idx, review in enumerate(reviews)
+        )
+        call_command('reconcile_counts')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    yield {
+        'title': titles[0],
+        'review': reviews[0],
+        'user': users[1],
+        'category': categories[0],
+        'genre': genres[0],
+    }
+    with django_db_blocker.unblock():
+        call_command('flush', interactive=False)
+
+
+def check_plans(url, plans):
+    for sql, plan in plans:
+        full_scans = [line for line in plan if FULL_SCAN.match(line)]
+        assert not full_scans, (
+            f'Проверьте, что запрос к `{url}` не читает таблицу целиком:\n'
+            f'{sql}\n' + '\n'.join(plan)
+        )
+        if any('TEMP B-TREE' in line for line in plan):
+            assert PAGE_LOOKUP.search(sql), (
+                f'Проверьте, что запрос к `{url}` берет порядок сортировки '
+                f'из индекса:\n{sql}\n' + '\n'.join(plan)
+            )
+
+
+@pytest.mark.django_db
+class Test19QueryPlans:
+
+    PUBLIC_URLS = (
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        '/api/v1/titles/',
+        '/api/v1/titles/?pagination=cursor',
+        '/api/v1/titles/?category={category}',
+        '/api/v1/titles/?genre={genre}',
+        '/api/v1/titles/?ordering=-rating',
+        '/api/v1/titles/?category={category}&ordering=year',
+        '/api/v1/titles/top/',
+        '/api/v1/titles/top/?genre={genre}',
+        '/api/v1/titles/{title}/',
+        '/api/v1/titles/{title}/?reviews_preview=5',
+        '/api/v1/titles/{title}/rating-distribution/',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/?pagination=cursor',
+        '/api/v1/titles/{title}/reviews/{review}/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+        '/api/v1/activity/',
+        '/api/v1/activity/?category={category}',
+        '/api/v1/activity/?genre={genre}',
+    )
+    ADMIN_URLS = (
+        '/api/v1/users/',
+        '/api/v1/users/{username}/',
+        '/api/v1/users/?search=USER1',
+        '/api/v1/users/?search=er19&match=contains',
+        '/api/v1/reviews/search/?search=отзыв',
+    )
+
+    def format_url(self, url, data):
+        return url.format(
+            title=data['title'].id,
+            review=data['review'].id,
+            username=data['user'].username,
+            category=data['category'].slug,
+            genre=data['genre'].slug,
+        )
+
+    @pytest.mark.parametrize('url', PUBLIC_URLS)
+    def test_01_public_endpoints(self, client, synthetic_data, url):
+        url = self.format_url(url, synthetic_data)
+        response, plans = capture_query_plans(client, url)
+        assert response.status_code == HTTPStatus.OK
+        check_plans(url, plans)
+
+    @pytest.mark.parametrize('url', ADMIN_URLS)
+    def test_02_admin_endpoints(self, admin_client, synthetic_data, url):
+        url = self.format_url(url, synthetic_data)
+        response, plans = capture_query_plans(admin_client, url)
+        assert response.status_code == HTTPStatus.OK
+        check_plans(url, plans)
+
+    def test_03_user_deletion(self, admin_client, synthetic_data):
+        url = self.format_url('/api/v1/users/{username}/', synthetic_data)
+        response, plans = capture_query_plans(admin_client, url, 'delete')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        check_plans(url, plans)
@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre
+from tests.utils import check_query_budget, create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TaxonomySnapshot:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+    GENRE_SLUG_TEMPLATE_URL = '/api/v1/genres/{slug}/'
+
+    def test_01_no_queries(self, client, admin_client):
+        create_categories(admin_client)
+        create_genre(admin_client)
+        client.get(self.GENRES_URL)
+        client.get(self.CATEGORIES_URL)
+        for url in (
+            f'{self.GENRES_URL}?search=др',
+            f'{self.GENRES_URL}?search=УЖАС',
+            f'{self.GENRES_URL}?page=1',
+            f'{self.CATEGORIES_URL}?search=книги',
+        ):
+            response = check_query_budget(client, url, 0)
+            assert response.status_code == HTTPStatus.OK
+            assert response['X-Cache'] == 'MISS'
+
+        data = client.get(f'{self.GENRES_URL}?search=ужасы').json()
+        assert data['results'] == [{'name': 'Ужасы', 'slug': 'horror'}], (
+            'Проверьте, что поиск жанров не зависит от регистра.'
+        )
+        data = client.get(self.GENRES_URL, {'search': 'а д'}).json()
+        assert data['count'] == 1, (
+            'Проверьте, что при поиске жанров учитываются все слова запроса.'
+        )
+        data = client.get(self.CATEGORIES_URL).json()
+        assert [category['name'] for category in data['results']] == [
+            'Книги', 'Фильм'
+        ], 'Проверьте, что категории отсортированы по названию.'
+
+    def test_02_rebuild_on_change(self, client, admin_client):
+        create_genre(admin_client)
+        assert client.get(self.GENRES_URL).json()['count'] == 3
+
+        admin_client.delete(
+            self.GENRE_SLUG_TEMPLATE_URL.format(slug='drama')
+        )
+        data = client.get(f'{self.GENRES_URL}?search=драма').json()
+        assert data['count'] == 0, (
+            'Проверьте, что снимок жанров пересобирается после удаления '
+            'жанра.'
+        )
+
+        Genre.objects.create(name='Вестерн', slug='western')
+        data = client.get(f'{self.GENRES_URL}?search=вест').json()
+        assert data['results'] == [{'name': 'Вестерн', 'slug': 'western'}], (
+            'Проверьте, что снимок жанров пересобирается, когда жанр '
+            'добавлен другим процессом.'
+        )
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.search import USER_SEARCH_INDEX
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21UserSearch:
+
+    USERS_URL = '/api/v1/users/'
+    USER_DETAIL_URL_TEMPLATE = '/api/v1/users/{username}/'
+
+    def search(self, client, **params):
+        response = client.get(self.USERS_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [user['username'] for user in response.json()['results']]
+
+    def test_01_prefix_search(self, admin_client, admin, user, moderator):
+        assert self.search(admin_client, search='testm') == [
+            moderator.username
+        ], 'Проверьте, что поиск пользователей не зависит от регистра.'
+        assert self.search(admin_client, search='test') == [
+            admin.username, moderator.username, user.username
+        ], (
+            'Проверьте, что найденные пользователи упорядочены по имени.'
+        )
+        assert self.search(admin_client, search='user') == [], (
+            'Проверьте, что по умолчанию поиск идет по началу имени '
+            'пользователя.'
+        )
+
+    def test_02_substring_search(self, admin_client, admin, user):
+        assert self.search(admin_client, search='USER', match='contains') == [
+            user.username
+        ], (
+            'Проверьте, что при `match=contains` поиск идет по подстроке '
+            'имени пользователя.'
+        )
+        assert self.search(admin_client, search='us', match='contains') == [
+            user.username
+        ]
+        response = admin_client.get(
+            self.USERS_URL, {'search': 'test', 'match': 'some'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_renamed_user(self, admin_client, user):
+        admin_client.patch(
+            self.USER_DETAIL_URL_TEMPLATE.format(username=user.username),
+            data={'username': 'Renamed'},
+        )
+        assert self.search(admin_client, search='rena') == ['Renamed']
+        assert self.search(
+            admin_client, search='named', match='contains'
+        ) == ['Renamed'], (
+            'Проверьте, что индексы поиска обновляются при изменении имени '
+            'пользователя.'
+        )
+        assert self.search(admin_client, search='testu') == []
+
+    def test_04_triggers_restored_after_migrate(self, admin_client,
+                                               django_user_model):
+        # Так выглядит индекс после миграции, пересоздавшей таблицу.
+        with connection.cursor() as cursor:
+            for action in ('insert', 'delete', 'update'):
+                cursor.execute(
+                    f'DROP TRIGGER {USER_SEARCH_INDEX.table}_{action}'
+                )
+        call_command('migrate', verbosity=0)
+        django_user_model.objects.create_user(
+            username='Pelevin', email='pelevin@yamdb.fake'
+        )
+        assert self.search(
+            admin_client, search='levi', match='contains'
+        ) == ['Pelevin'], (
+            'Проверьте, что после миграций триггеры поискового индекса '
+            'пользователей устанавливаются заново.'
+        )
+
+    def test_05_loaded_users(self, admin_client):
+        call_command('load_csv')
+        assert self.search(admin_client, search='bingo') == ['bingobongo'], (
+            'Проверьте, что пользователи, загруженные командой `load_csv`, '
+            'находятся поиском.'
+        )
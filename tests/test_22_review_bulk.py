@@ -0,0 +1,148 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import GenreRating, Review
+from reviews.utils import (
+    IMPORT_AUTHOR_NOT_FOUND, IMPORT_DUPLICATE_REVIEW, IMPORT_TITLE_NOT_FOUND,
+    import_reviews
+)
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ReviewBulk:
+
+    BULK_URL = '/api/v1/reviews/bulk/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def post_ndjson(self, client, rows):
+        body = '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows)
+        return client.post(
+            self.BULK_URL,
+            data=body.encode(),
+            content_type='application/x-ndjson',
+        )
+
+    def test_01_permissions(self, client, user_client, moderator_client):
+        assert client.post(
+            self.BULK_URL, data='[]', content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        for role_client in (user_client, moderator_client):
+            response = role_client.post(self.BULK_URL, data=[], format='json')
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{self.BULK_URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_02_per_row_results(self, client, admin_client, admin, user,
+                                user_client, moderator):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Было', 5)
+        rows = [
+            {'title': titles[0]['id'], 'author': moderator.username,
+             'text': 'Хорошо', 'score': 10},
+            {'title': titles[0]['id'], 'author': user.username,
+             'text': 'Повтор', 'score': 1},
+            {'title': titles[1]['id'], 'author': admin.username,
+             'text': 'Плохо', 'score': 11},
+            {'title': 0, 'author': admin.username, 'text': 'Нет', 'score': 5},
+            {'title': titles[1]['id'], 'author': 'nobody', 'text': 'Нет',
+             'score': 5},
+            {'title': titles[1]['id'], 'author': admin.username,
+             'text': 'Неплохо', 'score': 6},
+            {'title': titles[1]['id'], 'author': admin.username,
+             'text': 'Еще раз', 'score': 7},
+        ]
+        response = self.post_ndjson(admin_client, rows)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['created'], data['failed']) == (2, 5)
+        results = data['results']
+        assert [result['index'] for result in results] == list(range(7))
+        assert 'id' in results[0] and 'id' in results[5], (
+            'Проверьте, что для созданных отзывов возвращается их `id`.'
+        )
+        assert set(results[1]['errors']) == {'non_field_errors'}
+        assert set(results[2]['errors']) == {'score'}
+        assert set(results[3]['errors']) == {'title'}
+        assert set(results[4]['errors']) == {'author'}
+        assert set(results[6]['errors']) == {'non_field_errors'}, (
+            'Проверьте, что повтор автора и произведения внутри пакета '
+            'отклоняется.'
+        )
+        review = Review.objects.get(pk=results[5]['id'])
+        assert (review.author_id, review.score) == (admin.id, 6)
+
+        title = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        ).json()
+        assert title['rating'] == 7, (
+            'Проверьте, что после пакетной загрузки пересчитывается рейтинг '
+            'произведения.'
+        )
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id'])
+            + 'reviews/'
+        )
+        assert response.json()['count'] == 1
+        assert set(
+            GenreRating.objects.filter(
+                title_id=titles[1]['id']
+            ).values_list('rating', flat=True)
+        ) == {6}
+
+    def test_03_constant_queries(self, admin_client, admin, user, moderator):
+        titles, _, _ = create_titles(admin_client)
+        batches = (
+            [(titles[0]['id'], admin)],
+            [(titles[1]['id'], author) for author in (admin, user, moderator)],
+        )
+        query_counts = []
+        for batch in batches:
+            rows = [
+                {'title': title_id, 'author': author.username,
+                 'text': 'Текст', 'score': 5}
+                for title_id, author in batch
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.BULK_URL, data=rows, format='json'
+                )
+            assert response.json()['created'] == len(batch)
+            query_counts.append(len(context))
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что число запросов при пакетной загрузке не зависит '
+            'от числа отзывов.'
+        )
+
+    def test_04_invalid_body(self, admin_client):
+        response = admin_client.post(self.BULK_URL, data={}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(
+            self.BULK_URL, data=b'{"title": 1}\n{',
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_import_error_codes(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        results = import_reviews([
+            {'title': titles[0]['id'], 'author': admin.username,
+             'text': 'Текст', 'score': 5},
+            {'title': titles[0]['id'], 'author': admin.username,
+             'text': 'Повтор', 'score': 5},
+            {'title': 0, 'author': admin.username, 'text': 'Нет',
+             'score': 5},
+            {'title': titles[0]['id'], 'author': 'nobody', 'text': 'Нет',
+             'score': 5},
+        ])
+        assert [result.get('error') for result in results] == [
+            None, IMPORT_DUPLICATE_REVIEW, IMPORT_TITLE_NOT_FOUND,
+            IMPORT_AUTHOR_NOT_FOUND,
+        ], (
+            'Проверьте, что `import_reviews` возвращает коды ошибок строк.'
+        )
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.export import iter_title_reviews
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ReviewExport:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/export/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def comments(self, admin_client, admin, user, user_client, moderator,
+                 moderator_client):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+
+    def get_content(self, client, url, params=None):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отзывов отдается потоком.'
+        )
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_01_ndjson(self, client, comments):
+        _, reviews, titles = comments
+        title_id = titles[0]['id']
+        url = self.EXPORT_URL_TEMPLATE.format(title_id=title_id)
+        response, content = self.get_content(client, url)
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        listed = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        ).json()['results']
+        assert rows == listed, (
+            'Проверьте, что выгрузка в NDJSON содержит те же отзывы и поля, '
+            'что и список отзывов.'
+        )
+
+        _, content = self.get_content(client, url, {'comments': 'true'})
+        rows = {
+            row['id']: row
+            for row in map(json.loads, content.splitlines())
+        }
+        listed = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id']
+        )).json()['results']
+        assert rows[reviews[0]['id']]['comments'] == listed, (
+            'Проверьте, что при `comments=true` в отзывы встраиваются их '
+            'комментарии.'
+        )
+        assert rows[reviews[1]['id']]['comments'] == []
+
+        response = client.get(self.EXPORT_URL_TEMPLATE.format(title_id=0))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_csv(self, client, comments):
+        _, reviews, titles = comments
+        url = self.EXPORT_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response, content = self.get_content(client, url, {'format': 'csv'})
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == len(reviews)
+        assert set(rows[0]) == {
+            'id', 'author', 'text', 'score', 'pub_date', 'comments_count'
+        }
+
+        _, content = self.get_content(
+            client, url, {'format': 'csv', 'comments': 'true'}
+        )
+        rows = list(csv.DictReader(io.StringIO(content)))
+        types = [row['type'] for row in rows]
+        assert types.count('review') == 3 and types.count('comment') == 3
+        commented = rows[types.index('comment') - 1]
+        assert commented['type'] == 'review'
+        assert commented['id'] == str(reviews[0]['id'])
+        assert all(
+            row['review_id'] == str(reviews[0]['id'])
+            for row in rows if row['type'] == 'comment'
+        ), (
+            'Проверьте, что в CSV комментарии идут сразу после своего отзыва.'
+        )
+
+        response = client.get(url, {'format': 'xml'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_chunked_queries(self, comments):
+        _, reviews, titles = comments
+        with CaptureQueriesContext(connection) as context:
+            rows = list(
+                iter_title_reviews(titles[0]['id'], True, chunk_size=1)
+            )
+        assert len(rows) == len(reviews)
+        assert len(context) == 1 + len(reviews), (
+            'Проверьте, что отзывы читаются одним итератором, а комментарии '
+            '- одним запросом на порцию отзывов.'
+        )
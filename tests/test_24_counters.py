@@ -0,0 +1,203 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Counters:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    USER_DETAIL_URL_TEMPLATE = '/api/v1/users/{username}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    @pytest.fixture
+    def comments(self, admin_client, admin, user, user_client):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+        })
+
+    def get_comments_counts(self, client, title_id):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return {
+            review['id']: review['comments_count']
+            for review in response.json()['results']
+        }
+
+    def test_01_comments_count(self, client, admin_client, user_client,
+                               comments):
+        created, reviews, titles = comments
+        title_id = titles[0]['id']
+        assert self.get_comments_counts(client, title_id) == {
+            reviews[0]['id']: 2, reviews[1]['id']: 0
+        }, (
+            'Проверьте, что в отзывах выводится количество комментариев.'
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        etag = response['ETag']
+
+        admin_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id'],
+            comment_id=created[0]['id'],
+        ))
+        create_single_comment(
+            user_client, title_id, reviews[1]['id'], 'Новый'
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение комментариев сбрасывает ETag списка '
+            'отзывов.'
+        )
+        assert self.get_comments_counts(client, title_id) == {
+            reviews[0]['id']: 1, reviews[1]['id']: 1
+        }, (
+            'Проверьте, что счетчик комментариев обновляется при добавлении '
+            'и удалении комментариев.'
+        )
+
+    def test_02_reviews_count(self, client, comments):
+        _, reviews, titles = comments
+        data = client.get(self.TITLES_URL).json()['results']
+        counts = {title['id']: title['reviews_count'] for title in data}
+        assert counts == {titles[0]['id']: 2, titles[1]['id']: 0}, (
+            'Проверьте, что в произведениях выводится количество отзывов.'
+        )
+
+    def test_03_reconcile_counts_command(self, client, comments):
+        _, reviews, titles = comments
+        call_command('reconcile_counts', '--check')
+
+        Review.objects.filter(pk=reviews[0]['id']).update(comments_count=7)
+        Title.objects.filter(pk=titles[0]['id']).update(reviews_count=0)
+        with pytest.raises(CommandError):
+            call_command('reconcile_counts', '--check')
+        # Кешируем ответы с испорченными счетчиками.
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        assert client.get(title_url).json()['reviews_count'] == 0
+        assert self.get_comments_counts(
+            client, titles[0]['id']
+        )[reviews[0]['id']] == 7
+
+        call_command('reconcile_counts')
+        call_command('reconcile_counts', '--check')
+        assert Review.objects.get(pk=reviews[0]['id']).comments_count == 2
+        assert Title.objects.get(pk=titles[0]['id']).reviews_count == 2, (
+            'Проверьте, что команда `reconcile_counts` восстанавливает '
+            'счетчики отзывов и комментариев.'
+        )
+        assert client.get(title_url).json()['reviews_count'] == 2
+        assert self.get_comments_counts(
+            client, titles[0]['id']
+        )[reviews[0]['id']] == 2, (
+            'Проверьте, что команда `reconcile_counts` сбрасывает кеш '
+            'произведений и отзывов.'
+        )
+
+    def test_04_load_csv_counts(self):
+        call_command('load_csv')
+        assert Review.objects.filter(comments_count__gt=0).exists()
+        call_command('reconcile_counts', '--check')
+
+    def create_activity(self, django_user_model, size):
+        """
+        Создает пользователя `victim` и `size` произведений, в каждом из
+        которых есть его отзыв с чужим комментарием и чужой отзыв с его
+        комментарием. Все авторы также оставляют отзыв с комментарием к
+        общему произведению, которое возвращается первым.
+        """
+        victim = django_user_model.objects.create_user(
+            username=f'victim{size}', email=f'victim{size}@yamdb.fake'
+        )
+        shared = Title.objects.create(name='Общее', year=2000)
+        titles = [shared]
+        for idx in range(size):
+            author = django_user_model.objects.create_user(
+                username=f'author{size}_{idx}',
+                email=f'author{size}_{idx}@yamdb.fake',
+            )
+            title = Title.objects.create(name=f'Произведение {idx}', year=2000)
+            own = Review.objects.create(
+                title=title, author=victim, text='Отзыв', score=5
+            )
+            other = Review.objects.create(
+                title=title, author=author, text='Отзыв', score=7
+            )
+            Comment.objects.create(review=own, author=author, text='Текст')
+            Comment.objects.create(review=other, author=victim, text='Текст')
+            review = Review.objects.create(
+                title=shared, author=author, text='Отзыв', score=3
+            )
+            Comment.objects.create(review=review, author=victim, text='Текст')
+            titles.append(title)
+        return victim, titles
+
+    def count_delete_queries(self, admin_client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        return len(context)
+
+    def test_05_delete_query_budget(self, admin_client, django_user_model):
+        title_queries = []
+        user_queries = []
+        for size in (2, 6):
+            victim, titles = self.create_activity(django_user_model, size)
+            title_queries.append(self.count_delete_queries(
+                admin_client, self.TITLE_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0].id
+                )
+            ))
+            user_queries.append(self.count_delete_queries(
+                admin_client,
+                self.USER_DETAIL_URL_TEMPLATE.format(
+                    username=victim.username
+                ),
+            ))
+            call_command('reconcile_counts', '--check')
+        assert title_queries[0] == title_queries[1], (
+            'Проверьте, что число запросов при удалении произведения не '
+            'зависит от числа его отзывов и комментариев.'
+        )
+        assert user_queries[0] == user_queries[1], (
+            'Проверьте, что число запросов при удалении пользователя не '
+            'зависит от числа его отзывов и комментариев.'
+        )
+
+    def test_06_review_delete_uses_deltas(self, client, admin_client,
+                                          comments):
+        _, reviews, titles = comments
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+                + f'reviews/{reviews[1]["id"]}/'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not any(
+            'SUM(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что удаление отзыва обновляет рейтинг произведения '
+            'приращением, а не пересчетом по всем отзывам.'
+        )
+        call_command('reconcile_counts', '--check')
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from api.pagination import ActivityPagination
+from reviews.models import Comment, Review
+from tests.utils import (
+    capture_query_plans, create_comments, create_single_review
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Activity:
+
+    ACTIVITY_URL = '/api/v1/activity/'
+
+    @pytest.fixture
+    def comments(self, admin_client, admin, user, user_client, moderator,
+                 moderator_client):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+
+    @pytest.fixture
+    def small_pages(self, monkeypatch):
+        monkeypatch.setattr(ActivityPagination, 'page_size', 2)
+
+    def collect(self, client, params):
+        items = []
+        url = self.ACTIVITY_URL
+        while url:
+            response = client.get(url, params)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data
+            items.extend(data['results'])
+            url, params = data['next'], None
+        return [(item['type'], item['id']) for item in items]
+
+    def test_01_merged_feed(self, client, comments):
+        created, reviews, titles = comments
+        data = client.get(self.ACTIVITY_URL).json()
+        kinds = [item['type'] for item in data['results']]
+        assert kinds == ['comment'] * 3 + ['review'] * 3, (
+            'Проверьте, что лента упорядочена по убыванию даты публикации '
+            'отзывов и комментариев.'
+        )
+        comment = data['results'][0]
+        assert comment['id'] == created[-1]['id']
+        assert comment['review'] == reviews[0]['id']
+        assert comment['title'] == {
+            'id': titles[0]['id'], 'name': titles[0]['name']
+        }
+        review = data['results'][-1]
+        assert review['score'] == reviews[0]['score']
+        assert review['author'] == reviews[0]['author']
+
+    def test_02_cursor_pagination(self, client, comments, small_pages):
+        # Одинаковая дата у всех записей проверяет порядок при равенстве.
+        now = timezone.now()
+        Review.objects.update(pub_date=now)
+        Comment.objects.update(pub_date=now)
+        expected = [
+            *(('review', pk) for pk in sorted(
+                Review.objects.values_list('pk', flat=True), reverse=True
+            )),
+            *(('comment', pk) for pk in sorted(
+                Comment.objects.values_list('pk', flat=True), reverse=True
+            )),
+        ]
+        assert self.collect(client, {}) == expected, (
+            'Проверьте, что курсор ленты проходит все записи без пропусков '
+            'и повторов, в том числе при одинаковой дате публикации.'
+        )
+        response = client.get(self.ACTIVITY_URL, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_filters(self, client, admin_client, user_client, comments):
+        _, _, titles = comments
+        create_single_review(user_client, titles[1]['id'], 'Другой', 4)
+        category = titles[1]['category']
+        assert self.collect(client, {'category': category}) == [
+            ('review', Review.objects.get(title_id=titles[1]['id']).pk)
+        ], (
+            'Проверьте, что лента фильтруется по категории произведения.'
+        )
+        genre = titles[0]['genre'][0]
+        items = self.collect(client, {'genre': genre})
+        assert len(items) == 6 and ('review', Review.objects.get(
+            title_id=titles[1]['id']
+        ).pk) not in items, (
+            'Проверьте, что лента фильтруется по жанру произведения.'
+        )
+        assert self.collect(client, {'genre': 'unknown'}) == []
+
+    def test_04_next_page_plan(self, client, comments, small_pages):
+        next_url = client.get(self.ACTIVITY_URL).json()['next']
+        response, plans = capture_query_plans(client, next_url)
+        assert response.status_code == HTTPStatus.OK
+        for sql, plan in plans:
+            assert not any('TEMP B-TREE' in line for line in plan), (
+                'Проверьте, что страницы ленты читаются по индексу даты '
+                f'публикации:\n{sql}\n' + '\n'.join(plan)
+            )
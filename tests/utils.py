@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +308,39 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def check_query_budget(client, url, max_queries, method='get', data=None,
+                       **extra):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, **extra)
+    assert len(context) <= max_queries, (
+        f'Проверьте, что {method.upper()}-запрос к `{url}` выполняет не '
+        f'больше {max_queries} запросов к базе данных. Сейчас выполняется '
+        f'{len(context)}:\n'
+        + '\n'.join(query['sql'] for query in context.captured_queries)
+    )
+    return response
+
+
+def capture_query_plans(client, url, method='get', data=None, **extra):
+    """
+    Выполняет запрос и возвращает ответ и планы всех его SELECT-запросов в
+    виде списка пар (sql, строки EXPLAIN QUERY PLAN).
+    """
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        response = getattr(client, method)(url, data=data, **extra)
+    plans = []
+    with connection.cursor() as cursor:
+        for sql, params in queries:
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+    return response, plans